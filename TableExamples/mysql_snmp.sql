@@ -10,6 +10,39 @@ CREATE TABLE IF NOT EXISTS snmp.snmp_oid_metadata (
     ,info               VARCHAR(2000)                          -- The textual description from the MIB
     ,oid_type           VARCHAR(255)                           -- "scalar", "table", "notification", etc.
     ,mib_module         VARCHAR(50)                            -- Source file / Module Name
+    ,row_hash           CHAR(40)                               -- sha1 of the row content, used by mib_parser.py --manifest to only write changed rows (added on connect if missing)
+);
+
+
+-- create snmp_mib_manifest table, one row per MIB module loaded by mib_parser.py --manifest (created on connect if missing)
+CREATE TABLE IF NOT EXISTS snmp.snmp_mib_manifest (
+     mib_module         VARCHAR(255) PRIMARY KEY               -- Module Name (e.g., "TRUENAS-MIB")
+    ,source_hash        CHAR(64)     NOT NULL                  -- sha256 of the MIB source text the rows were loaded from
+    ,parser_version     VARCHAR(32)  NOT NULL                  -- mib_parser.py __version__ that produced the rows
+    ,row_count          INTEGER      NOT NULL                  -- Number of OIDs the MIB produced
+    ,loaded_at          TIMESTAMP    NOT NULL                  -- When the load completed
+);
+
+
+-- create snmp_oid_value_maps table, value decoding data per scalar / column, written with mib_parser.py --value-maps (created on connect if missing)
+CREATE TABLE IF NOT EXISTS snmp.snmp_oid_value_maps (
+     oid_string         VARCHAR(255) PRIMARY KEY               -- The numerical OID, as in snmp_oid_metadata
+    ,mib_module         VARCHAR(255)                           -- Module Name
+    ,base_type          VARCHAR(50)                            -- SMI type under the textual conventions (e.g., "Integer32", "OctetString")
+    ,display_hint       VARCHAR(255)                           -- DISPLAY-HINT of the textual convention (e.g., "255a", "1x:")
+    ,enums              TEXT                                   -- JSON value -> name (e.g., '{"1": "up", "2": "down"}')
+    ,ranges             TEXT                                   -- JSON list of allowed value ranges (e.g., '[[0, 127]]')
+    ,sizes              TEXT                                   -- JSON list of allowed sizes (e.g., '[[0, 255]]')
+);
+
+
+-- create snmp_oid_table_indexes table, INDEX / AUGMENTS structure per table entry, written with mib_parser.py --table-indexes (created on connect if missing)
+CREATE TABLE IF NOT EXISTS snmp.snmp_oid_table_indexes (
+     oid_string         VARCHAR(255) PRIMARY KEY               -- The numerical OID of the table entry (e.g., ifEntry "1.3.6.1.2.1.2.2.1")
+    ,mib_module         VARCHAR(255)                           -- Module Name
+    ,object_name        VARCHAR(255)                           -- Name of the table entry (e.g., "ifEntry")
+    ,augments           VARCHAR(255)                           -- OID of the entry this one AUGMENTS (e.g., ifXEntry -> ifEntry), NULL for its own INDEX
+    ,index_objects      TEXT                                   -- JSON list of the INDEX objects in order: name, module, oid, base_type, encoding, length, implied, format
 );
 
 
@@ -0,0 +1,142 @@
+#######################################################################################################################
+#
+#
+#  	Project     	: 	SNMP MIB Parser
+#
+#   File            :   benchmarks/bench_importtime.py
+#
+#   Description     :   Startup import cost of mib_parser, measured with python -X importtime in a fresh interpreter,
+#                   :   plus the extra cost of loading each database backend's driver.
+#
+#                   :   Doubles as a regression check, exits 1 when importing mib_parser pulls in any database
+#                   :   backend, and with it its driver (they are meant to be imported lazily for the --db-type in
+#                   :   use), or when it takes longer than --budget-ms.
+#
+#   Usage           :   python benchmarks/bench_importtime.py [--repeat 5] [--top 10] [--budget-ms 0]
+#
+#
+########################################################################################################################
+__author__      = "George Leonard"
+__email__       = "georgelza@gmail.com"
+__version__     = "0.0.1"
+__copyright__   = "Copyright 2025, George Leonard"
+
+
+import argparse, os, subprocess, sys
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+sys.path.insert(0, BASE_DIR)
+
+from db                 import BACKENDS
+
+
+def importtime(statement):
+    """
+    Run statement in a fresh interpreter under -X importtime, returns the imports in the order they completed as
+    [(nesting depth, module, self us, cumulative us)].
+    """
+
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', statement],
+                            cwd=BASE_DIR, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"'{statement}' failed: {result.stderr.strip().splitlines()[-1:]}")
+
+    #end if
+
+    imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+
+        #end if
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip()) - 1) // 2       # Nested imports are indented under their importer
+        imports.append((depth, name.strip(), int(self_us), int(cumulative_us)))
+
+    #end for
+    return imports
+
+#end def
+
+
+def imported_after(imports, module):
+    """Cumulative us of the top level imports that completed after module, i.e. what the statement did next."""
+
+    names = [name for _, name, _, _ in imports]
+    return sum(cumulative for depth, _, _, cumulative in imports[names.index(module) + 1:] if depth == 0)
+
+#end def
+
+
+def subtree(imports, module):
+    """The imports module pulled in (itself last), the entries since the previous top level import completed."""
+
+    end   = [name for _, name, _, _ in imports].index(module)
+    start = end
+    while start > 0 and imports[start - 1][0] > 0:
+        start -= 1
+
+    #end while
+    return imports[start:end + 1]
+
+#end def
+
+
+def cumulative(imports, module):
+    return subtree(imports, module)[-1][3]
+
+#end def
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Measure and check the import time of mib_parser.")
+    parser.add_argument('--repeat',     type=int,   default=5,  help='Runs per measurement, the fastest one is reported.')
+    parser.add_argument('--top',        type=int,   default=10, help='Show the N modules with the highest cumulative import time.')
+    parser.add_argument('--budget-ms',  type=float, default=0,  help='Fail when importing mib_parser takes longer (0 = no budget).')
+    args = parser.parse_args()
+
+    failed  = False
+    imports = min((importtime("import mib_parser") for _ in range(args.repeat)), key=lambda run: cumulative(run, 'mib_parser'))
+    total   = cumulative(imports, 'mib_parser')
+
+    print(f"import mib_parser: {total / 1000:8.1f} ms")
+    for depth, name, self_us, cumulative_us in sorted(subtree(imports, 'mib_parser'), key=lambda entry: entry[3], reverse=True)[1:args.top + 1]:
+        print(f"  {name:40s} {cumulative_us / 1000:8.1f} ms")
+
+    #end for
+
+    backends = {module for module, _, _ in BACKENDS.values()}
+    eager    = sorted({name for _, name, _, _ in subtree(imports, 'mib_parser') if name in backends})
+    if eager:
+        print(f"FAIL: database backends imported eagerly: {', '.join(eager)}")
+        failed = True
+
+    #end if
+
+    if args.budget_ms and total / 1000 > args.budget_ms:
+        print(f"FAIL: import time {total / 1000:.1f} ms over the budget of {args.budget_ms:.1f} ms")
+        failed = True
+
+    #end if
+
+    print(f"\nBackend import cost, module and driver (db.load_backend):")
+    for db_type in BACKENDS:
+        try:
+            driver_us = min(imported_after(importtime(f"import db; db.load_backend('{db_type}')"), 'db') for _ in range(args.repeat))
+            print(f"  {db_type:12s} {driver_us / 1000:8.1f} ms")
+
+        except RuntimeError as e:
+            print(f"  {db_type:12s} {'n/a':>8s}    {e}")
+
+        #end try
+    #end for
+
+    sys.exit(1 if failed else 0)
+
+#end def
+
+
+if __name__ == "__main__":
+    main()
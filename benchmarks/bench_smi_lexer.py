@@ -0,0 +1,140 @@
+#######################################################################################################################
+#
+#
+#  	Project     	: 	SNMP MIB Parser
+#
+#   File            :   benchmarks/bench_smi_lexer.py
+#
+#   Description     :   Throughput of the smi_lexer based OBJECT-TYPE metadata parse versus the original
+#                   :   DOTALL/lazy-body regex parse, over a directory of MIB files (randommibs/ by default).
+#
+#   Usage           :   python benchmarks/bench_smi_lexer.py [--corpus randommibs] [--repeat 3] [--top 5]
+#
+#
+########################################################################################################################
+__author__      = "George Leonard"
+__email__       = "georgelza@gmail.com"
+__version__     = "0.0.1"
+__copyright__   = "Copyright 2025, George Leonard"
+
+
+import argparse, os, re, sys, time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from smi_lexer          import iter_definitions
+
+
+def regex_metadata(content):
+    """The original parse_mib_file_for_metadata body, kept here as the baseline."""
+
+    clean_lines = []
+    for line in content.split('\n'):
+        if '--' in line:
+            line = line.split('--')[0]
+
+        clean_lines.append(line)
+
+    content         = '\n'.join(clean_lines)
+    metadata        = {}
+    object_pattern  = r'(\w+)\s+OBJECT-TYPE\s+(.*?)(?=\n\s*\w+\s+OBJECT-TYPE|\n\s*\w+\s+::=|\Z)'
+
+    for match in re.findall(object_pattern, content, re.DOTALL | re.IGNORECASE):
+        obj_body    = match[1].strip()
+        info_match  = re.search(r'DESCRIPTION\s*"([^"]*)"', obj_body, re.DOTALL)
+        syntax_match= re.search(r'SYNTAX\s+([^\s\n]+)', obj_body, re.IGNORECASE)
+
+        metadata[match[0].strip()] = {
+            'info': info_match.group(1).strip() if info_match else "",
+            'type': syntax_match.group(1).strip() if syntax_match else ""
+        }
+
+    return metadata
+
+#end def
+
+
+def lexer_metadata(content):
+    """What MibSource.metadata does with the lexer."""
+
+    return {r['name']: {'info': (r['description'] or "").strip(), 'type': r['syntax'] or ""}
+            for r in iter_definitions(content) if r['macro'] == 'OBJECT-TYPE'}
+
+#end def
+
+
+def load_corpus(corpus_dir):
+
+    texts = []
+    for filename in sorted(os.listdir(corpus_dir)):
+        path = os.path.join(corpus_dir, filename)
+        if os.path.isfile(path):
+            with open(path, 'rb') as f:
+                texts.append((filename, f.read().decode('utf-8', 'ignore')))
+
+            #end with
+        #end if
+    #end for
+    return texts
+
+#end def
+
+
+def run(parse, texts, repeat):
+    """Best of `repeat` runs over the corpus, plus the per file timings of the best run."""
+
+    best_total, best_files = None, None
+    for _ in range(repeat):
+        files = []
+        start = time.perf_counter()
+        for name, text in texts:
+            t0 = time.perf_counter()
+            parse(text)
+            files.append((time.perf_counter() - t0, name, len(text)))
+
+        #end for
+        total = time.perf_counter() - start
+        if best_total is None or total < best_total:
+            best_total, best_files = total, files
+
+        #end if
+    #end for
+    return best_total, best_files
+
+#end def
+
+
+def main():
+
+    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    parser = argparse.ArgumentParser(description="Benchmark the SMI lexer against the original OBJECT-TYPE regex.")
+    parser.add_argument('--corpus', default=os.path.join(base_dir, 'randommibs'), help='Directory of MIB files to parse.')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per implementation, the best one is reported.')
+    parser.add_argument('--top',    type=int, default=5, help='Show the N files the regex is slowest on.')
+    args = parser.parse_args()
+
+    texts       = load_corpus(args.corpus)
+    total_bytes = sum(len(t) for _, t in texts)
+
+    print(f"Corpus: {args.corpus}, {len(texts)} files, {total_bytes / 1e6:.1f} MB")
+
+    results = {}
+    for label, parse in (('regex', regex_metadata), ('lexer', lexer_metadata)):
+        seconds, files  = run(parse, texts, args.repeat)
+        results[label]  = dict((name, t) for t, name, _ in files)
+        print(f"{label:6s}: {seconds:8.3f} s  {total_bytes / seconds / 1e6:8.2f} MB/s")
+
+    #end for
+
+    print(f"\nFiles the regex is slowest on (seconds, regex vs lexer):")
+    sizes = dict(texts)
+    for name in sorted(results['regex'], key=results['regex'].get, reverse=True)[:args.top]:
+        print(f"  {name:40s} {len(sizes[name]):>9d} B  {results['regex'][name]:8.4f}  {results['lexer'][name]:8.4f}")
+
+    #end for
+#end def
+
+
+if __name__ == "__main__":
+    main()
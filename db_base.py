@@ -0,0 +1,388 @@
+#######################################################################################################################
+#
+#
+#  	Project     	: 	SNMP MIB Parser
+#
+#   File            :   db_base.py
+#
+#   Description     :   Backend interface every database target implements, plus the parts they share: the row
+#                   :   layout, the row hash and the batched / changed rows only load loop.
+#
+#                   :   A backend implements connect, bulk_upsert, read_hashes, delete, load_manifest,
+#                   :   update_manifest, store_keyed_rows, keyed_rows_empty and (where the default does not do)
+#                   :   close. insert_oid_metadata drives them and keeps the counters of the last load in stats.
+#
+#                   :   Keyed tables (KEYED_TABLES) hold what is extracted next to the OID metadata, one row per OID,
+#                   :   each written to its own table (SQL) / hash (Redis) when a name is configured for it.
+#
+#	By              :   George Leonard ( georgelza@gmail.com )
+#
+#   Created     	:   05 Jul 2025
+#
+#
+########################################################################################################################
+__author__      = "George Leonard"
+__email__       = "georgelza@gmail.com"
+__version__     = "0.0.1"
+__copyright__   = "Copyright 2025, George Leonard"
+
+
+import hashlib, json, logging
+from itertools import islice
+
+
+# Columns of the OID metadata table, in the order rows are written
+OID_COLUMNS     = ('oid_string', 'object_name', 'info', 'data_type', 'oid_type', 'mib_module')
+
+# Content hash of a row, stored next to it so changes are found without comparing every column
+ROW_HASH_COLUMN = 'row_hash'
+
+# Columns of the load manifest, one row per MIB module loaded
+MANIFEST_COLUMNS = ('mib_module', 'source_hash', 'parser_version', 'row_count', 'loaded_at')
+
+# Columns of the value map table, one row per scalar / column with an enumeration, display hint or range (mib_values)
+VALUE_MAP_COLUMNS = ('oid_string', 'mib_module', 'base_type', 'display_hint', 'enums', 'ranges', 'sizes')
+
+# Columns of the table index table, one row per conceptual row (table entry): its INDEX objects and the row it
+# AUGMENTS (mib_tables)
+TABLE_INDEX_COLUMNS = ('oid_string', 'mib_module', 'object_name', 'augments', 'index_objects')
+
+# Tables keyed by oid_string, written next to the OID metadata and replaced per module on every load:
+# kind (the backend's <kind>_name setting names the table / Redis hash) -> (columns, columns stored as JSON text)
+KEYED_TABLES = {
+    'value_maps':       (VALUE_MAP_COLUMNS,   ('enums', 'ranges', 'sizes')),
+    'table_indexes':    (TABLE_INDEX_COLUMNS, ('index_objects',)),
+}
+
+
+def row_hash(oid):
+    """Stable content hash of a record's (object_name, info, data_type, oid_type, mib_module)."""
+
+    content = "\x1f".join("" if oid[col] is None else str(oid[col]) for col in OID_COLUMNS[1:])
+    return hashlib.sha1(content.encode('utf-8')).hexdigest()
+
+# end def
+
+
+def copy_text_value(value):
+    """
+    Escape a value for tab separated bulk load text, as read by PostgreSQL COPY ... FROM STDIN (text format)
+    and MySQL LOAD DATA with its default FIELDS/LINES options.
+    """
+
+    if value is None:
+        return r'\N'
+
+    # end if
+    return (str(value).replace('\\', '\\\\')
+                      .replace('\t', '\\t')
+                      .replace('\n', '\\n')
+                      .replace('\r', '\\r'))
+
+# end def
+
+
+def keyed_row_values(kind, row):
+    """Values of a row of keyed table kind in its column order, the JSON columns as JSON text."""
+
+    columns, json_columns = KEYED_TABLES[kind]
+    return tuple(json.dumps(row[col]) if col in json_columns and row[col] is not None else row[col] for col in columns)
+
+# end def
+
+
+def keyed_table_ddl(kind, table):
+    """CREATE TABLE IF NOT EXISTS of keyed table kind, valid for SQLite, PostgreSQL and MySQL."""
+
+    columns = [f"{'oid_string':<18} VARCHAR(255) PRIMARY KEY", f"{'mib_module':<18} VARCHAR(255)"]
+    columns += [f"{col:<18} TEXT" for col in KEYED_TABLES[kind][0][2:]]
+    separator = "\n            ,"
+    return f"""
+        CREATE TABLE IF NOT EXISTS {table} (
+             {separator.join(columns)}
+        );
+    """
+
+# end def
+
+
+class DatabaseBackend:
+    """
+    Base of the database backends. Holds the connection settings (each backend uses the ones that apply to it)
+    and the load loop, the backend specific work is done by the methods below that raise NotImplementedError.
+    """
+
+    db_type     = None          # --db-type the backend is registered under (see db.BACKENDS)
+    max_writers = None          # Connections that may write concurrently (--db-writers), None for no limit
+
+    def __init__(self, host=None, port=None, user=None, password=None, dbname=None, schema=None, tbl_name="snmp_oid_metadata", key_prefix="oid:", batch_size=1000, mysql_local_infile=False, redis_transaction=False, redis_retries=3, manifest_name=None, value_maps_name=None, table_indexes_name=None, changed_only=False, logger_instance=None):
+
+        self.host       = host
+        self.port       = port
+        self.user       = user
+        self.password   = password
+        self.dbname     = dbname
+        self.schema     = schema        # Schema for PostgreSQL/MySQL or Redis=0
+        self.tbl_name   = tbl_name      # Table name for SQL databases
+        self.key_prefix = key_prefix    # For Redis
+        self.batch_size = max(1, batch_size or 1)   # Records per write batch
+        self.connection = None
+        self.cursor     = None          # For SQL databases
+        self.mysql_local_infile = mysql_local_infile        # MySQL: bulk load via LOAD DATA LOCAL INFILE (opt-in)
+        self.redis_transaction  = redis_transaction         # Redis: wrap every pipeline chunk in MULTI/EXEC
+        self.redis_retries      = max(0, redis_retries)     # Redis: times a failed chunk is resent
+        self.manifest_name      = manifest_name             # Load manifest table (SQL) / hash key (Redis), None = no manifest
+        self.value_maps_name    = value_maps_name           # Value map table (SQL) / hash key (Redis), None = no value maps
+        self.table_indexes_name = table_indexes_name        # Table index table (SQL) / hash key (Redis), None = not written
+        self.changed_only       = changed_only              # Only write records that differ from what is stored, prune removed ones
+        self.columns            = OID_COLUMNS + (ROW_HASH_COLUMN,) if changed_only else OID_COLUMNS     # Columns written
+        self.load_stats         = {}                        # Counters of the last insert_oid_metadata call
+        self.logger     = logger_instance if logger_instance else logging.getLogger(__name__)
+
+    # end def
+
+
+    @property
+    def stats(self):
+        """Counters of the last load: records, inserted, updated, unchanged, deleted, failed_batches."""
+
+        return self.load_stats
+
+    # end def
+
+
+    def connect(self):
+        """Establish the connection (and create what the load needs, e.g. the manifest table), raises on failure."""
+
+        raise NotImplementedError
+
+    # end def
+
+
+    def bulk_upsert(self, batch):
+        """Insert or update one batch of records in as few round trips as the database allows, True on success."""
+
+        raise NotImplementedError
+
+    # end def
+
+
+    def read_hashes(self, batch):
+        """Stored row hashes of the records in batch, {oid_string: row_hash}, {} when they can not be read."""
+
+        raise NotImplementedError
+
+    # end def
+
+
+    def delete(self, mib_module, keep):
+        """Delete the stored records of mib_module whose OID is not in keep, returns the number deleted."""
+
+        raise NotImplementedError
+
+    # end def
+
+
+    def load_manifest(self):
+        """
+        Entries of the load manifest, {mib_module: {'source_hash', 'parser_version', 'row_count', 'loaded_at'}}.
+        Empty if there is no manifest or it could not be read (everything is then loaded).
+        """
+
+        raise NotImplementedError
+
+    # end def
+
+
+    def update_manifest(self, mib_module, source_hash, parser_version, row_count):
+        """Record a completed load of mib_module in the load manifest."""
+
+        raise NotImplementedError
+
+    # end def
+
+
+    @property
+    def keyed_tables(self):
+        """{kind: table (SQL) / hash key (Redis)} of the KEYED_TABLES this backend writes."""
+
+        return {kind: getattr(self, f"{kind}_name") for kind in KEYED_TABLES if getattr(self, f"{kind}_name", None)}
+
+    # end def
+
+
+    def store_keyed_rows(self, kind, rows, prune_module=None):
+        """
+        Upsert rows (dicts over the columns of keyed table kind) in one transaction, after deleting the stored
+        rows of prune_module when given. True on success.
+        """
+
+        raise NotImplementedError
+
+    # end def
+
+
+    def keyed_rows_empty(self, kind):
+        """True when keyed table kind is written and holds no rows yet."""
+
+        raise NotImplementedError
+
+    # end def
+
+
+    def write_keyed_rows(self, kind, rows, prune_module=None):
+        """
+        Write the keyed table rows extracted with the last insert_oid_metadata call, replacing the ones of
+        prune_module. Nothing is written when the backend has no name for kind. A failure counts as a failed
+        batch of that load, so record_load leaves the MIB to be loaded again next run. True unless the write failed.
+        """
+
+        table = self.keyed_tables.get(kind)
+        if not table:
+            return True
+
+        # end if
+        if self.connection and self.store_keyed_rows(kind, rows, prune_module):
+            self.logger.info(f"Wrote {len(rows)} rows into {self.db_type} '{table}'.")
+            return True
+
+        # end if
+        self.load_stats["failed_batches"] = self.load_stats.get("failed_batches", 0) + 1
+        return False
+
+    # end def
+
+
+    def record_load(self, mib_module, source_hash, parser_version, row_count):
+        """
+        Record the last insert_oid_metadata call as the load of mib_module, unless it had failed batches (the MIB
+        is then loaded again next run). True if it was recorded.
+        """
+
+        if self.load_stats.get("failed_batches"):
+            return False
+
+        # end if
+        self.update_manifest(mib_module, source_hash, parser_version, row_count)
+        return True
+
+    # end def
+
+
+    def close(self):
+        """Closes the database connection."""
+        if self.connection:
+            if self.cursor:
+                self.cursor.close()
+
+            # end if
+            self.connection.close()
+            self.connection = None
+            self.cursor     = None
+            self.logger.info(f"Closed {self.db_type} database connection.")
+
+        else:
+            self.logger.info("No active connection to close.")
+
+        # end if
+    # end def
+
+
+    def _table_name(self, tbl_name):
+        """Table name qualified with the schema, if one was given."""
+
+        return f"{self.schema}.{tbl_name}" if self.schema else tbl_name
+
+    # end def
+
+
+    def _row(self, oid):
+        """Values of a record in self.columns order."""
+
+        row = tuple(oid[col] for col in OID_COLUMNS)
+        return row + (row_hash(oid),) if self.changed_only else row
+
+    # end def
+
+
+    def insert_oid_metadata(self, oid_data, batch_size=None, prune_module=None):
+        """
+        Inserts OID metadata dictionaries into the connected database, in batches of batch_size records.
+        oid_data can be any iterable (e.g. the extractor's generator), it is consumed one batch at a time
+        so the first batches are written while the records are still being produced.
+        With changed_only, the row hash of every record in a batch is compared against the stored hashes and
+        only inserts and updates are written; when prune_module is given and every batch was written, the
+        stored rows of that module that were not in oid_data are deleted afterwards.
+        Returns the number of records consumed, the counters of the call (records, inserted, updated,
+        unchanged, deleted, failed_batches) are left in stats.
+        """
+        self.load_stats = {"records": 0, "inserted": 0, "updated": 0, "unchanged": 0, "deleted": 0, "failed_batches": 0}
+
+        if not self.connection:
+            self.logger.error("No active database connection. Please connect first.")
+            return 0
+
+        # end if
+
+        batch_size  = max(1, batch_size or self.batch_size)
+        oid_iter    = iter(oid_data)
+        stats       = self.load_stats
+        batches     = 0
+        seen        = set()             # OIDs of prune_module in this load
+
+        while True:
+            batch = list(islice(oid_iter, batch_size))
+            if not batch:
+                break
+
+            # end if
+            batches          += 1
+            stats["records"] += len(batch)
+
+            if prune_module:
+                seen.update(oid['oid_string'] for oid in batch if oid['mib_module'] == prune_module)
+
+            # end if
+
+            inserts = updates = len(batch)
+            if self.changed_only:
+                stored  = self.read_hashes(batch)
+                changed = [oid for oid in batch if stored.get(oid['oid_string']) != row_hash(oid)]
+                inserts = sum(1 for oid in changed if oid['oid_string'] not in stored)
+                updates = len(changed) - inserts
+                stats["unchanged"] += len(batch) - len(changed)
+                batch   = changed
+
+            # end if
+
+            if not batch:
+                continue
+
+            # end if
+            if self.bulk_upsert(batch):
+                stats["inserted"]   += inserts if self.changed_only else 0
+                stats["updated"]    += updates if self.changed_only else len(batch)
+
+            else:
+                stats["failed_batches"] += 1
+
+            # end if
+        # end while
+
+        # Rows of the module that are no longer produced, only safe to remove after a complete load
+        if prune_module and self.changed_only and not stats["failed_batches"]:
+            stats["deleted"] = self.delete(prune_module, seen)
+
+        # end if
+
+        if self.changed_only:
+            self.logger.info(f"Loaded {stats['records']} OIDs into {self.db_type} in {batches} batch(es) of up to {batch_size}: "
+                             f"{stats['inserted']} inserted, {stats['updated']} updated, {stats['unchanged']} unchanged, {stats['deleted']} deleted.")
+        else:
+            self.logger.info(f"Inserted/updated {stats['updated']} of {stats['records']} OIDs into {self.db_type} in {batches} batch(es) of up to {batch_size}.")
+
+        # end if
+        return stats["records"]
+
+    # end def
+# end class
@@ -0,0 +1,263 @@
+#######################################################################################################################
+#
+#
+#  	Project     	: 	SNMP MIB Parser
+#
+#   File            :   db_fanout.py
+#
+#   Description     :   Write one extracted record stream to several backends (--target ... --target ...).
+#
+#                   :   Every target gets its own writer thread, fed the same records through its own bounded
+#                   :   queue, and does its own batching, change detection, pruning and manifest bookkeeping. A
+#                   :   target that fails (can not connect, loses its connection, ...) is logged and left behind,
+#                   :   the other targets carry on, and only the targets that loaded cleanly record the load.
+#
+#	By              :   George Leonard ( georgelza@gmail.com )
+#
+#   Created     	:   05 Jul 2025
+#
+#
+########################################################################################################################
+__author__      = "George Leonard"
+__email__       = "georgelza@gmail.com"
+__version__     = "0.0.1"
+__copyright__   = "Copyright 2025, George Leonard"
+
+
+import queue, threading
+from itertools import islice
+
+from db_base import DatabaseBackend, KEYED_TABLES
+
+
+# Chunks of records a target's writer may lag behind the stream before the stream waits for it
+FANOUT_QUEUE_DEPTH  = 4
+
+_DONE = object()        # End of stream marker
+
+
+class FanOutBackend(DatabaseBackend):
+
+    db_type = 'fanout'
+
+    def __init__(self, targets, logger_instance=None):
+        """targets: list of (label, backend), label is how the target is named in the log (no credentials)."""
+
+        super().__init__(logger_instance=logger_instance)
+        self.targets         = list(targets)
+        self.batch_size      = max(backend.batch_size for label, backend in self.targets)
+        self.max_writers     = min((backend.max_writers for label, backend in self.targets if backend.max_writers), default=None)
+        for kind in KEYED_TABLES:
+            setattr(self, f"{kind}_name", next((backend.keyed_tables[kind] for label, backend in self.targets if kind in backend.keyed_tables), None))
+
+        # end for
+
+    # end def
+
+
+    def connect(self):
+        """Connect every target, the ones that fail are dropped. Raises if none could be connected."""
+
+        connected = []
+        for label, backend in self.targets:
+            try:
+                backend.connect()
+                connected.append((label, backend))
+
+            except Exception as e:
+                self.logger.error(f"Target {label} could not be connected, continuing without it: {e}")
+
+            # end try
+        # end for
+
+        if not connected:
+            raise ConnectionError("None of the targets could be connected")
+
+        # end if
+        self.targets    = connected
+        self.connection = True
+
+    # end def
+
+
+    def close(self):
+
+        for label, backend in self.targets:
+            backend.close()
+
+        # end for
+        self.connection = None
+
+    # end def
+
+
+    def load_manifest(self):
+        """
+        The manifest entries every target agrees on, so a MIB is only skipped when all targets hold a load of
+        the same source; a MIB missing from one of them is loaded into all, unchanged rows are not rewritten.
+        """
+
+        manifests = [backend.load_manifest() for label, backend in self.targets]
+        agreed    = {}
+        for mib_module, entry in manifests[0].items():
+            if all(mib_module in manifest and
+                   (manifest[mib_module]['source_hash'], manifest[mib_module]['parser_version']) == (entry['source_hash'], entry['parser_version'])
+                   for manifest in manifests[1:]):
+                agreed[mib_module] = entry
+
+            # end if
+        # end for
+        return agreed
+
+    # end def
+
+
+    def update_manifest(self, mib_module, source_hash, parser_version, row_count):
+
+        for label, backend in self.targets:
+            backend.update_manifest(mib_module, source_hash, parser_version, row_count)
+
+        # end for
+    # end def
+
+
+    def keyed_rows_empty(self, kind):
+        """True when any of the targets writing keyed table kind holds no rows in it yet."""
+
+        return any(backend.keyed_rows_empty(kind) for label, backend in self.targets)
+
+    # end def
+
+
+    def write_keyed_rows(self, kind, rows, prune_module=None):
+        """Every target writes the rows for itself, a target that fails them retries its load next run."""
+
+        written = [backend.write_keyed_rows(kind, rows, prune_module) for label, backend in self.targets]
+        return all(written)
+
+    # end def
+
+
+    def record_load(self, mib_module, source_hash, parser_version, row_count):
+        """Every target records the load for itself, a target with failed batches retries it next run."""
+
+        recorded = [backend.record_load(mib_module, source_hash, parser_version, row_count) for label, backend in self.targets]
+        return all(recorded)
+
+    # end def
+
+
+    def insert_oid_metadata(self, oid_data, batch_size=None, prune_module=None):
+        """
+        Write oid_data to every target concurrently. The stream is read once, in chunks that are handed to each
+        target's writer thread; stats adds up the targets' counters. Returns the number of records read.
+        """
+
+        if len(self.targets) == 1:
+            records         = self.targets[0][1].insert_oid_metadata(oid_data, batch_size, prune_module)
+            self.load_stats = self.targets[0][1].stats
+            return records
+
+        # end if
+
+        feeds   = [queue.Queue(maxsize=FANOUT_QUEUE_DEPTH) for _ in self.targets]
+        writers = [threading.Thread(target=self._write, args=(label, backend, feed, batch_size, prune_module), name=f"target-{label}", daemon=True)
+                   for (label, backend), feed in zip(self.targets, feeds)]
+
+        for writer in writers:
+            writer.start()
+
+        # end for
+
+        records = 0
+        end     = _DONE
+        try:
+            oid_iter = iter(oid_data)
+            while True:
+                chunk = list(islice(oid_iter, self.batch_size))
+                if not chunk:
+                    break
+
+                # end if
+                records += len(chunk)
+                for feed, writer in zip(feeds, writers):
+                    self._put(feed, writer, chunk)
+
+                # end for
+            # end while
+        except Exception as e:
+            end = e                     # Ends every target's load without pruning or recording it
+            raise
+
+        finally:
+            for feed, writer in zip(feeds, writers):
+                self._put(feed, writer, end)
+
+            # end for
+            for writer in writers:
+                writer.join()
+
+            # end for
+            self.load_stats = {"records": records}
+            for label, backend in self.targets:
+                for key, value in backend.stats.items():
+                    if key != "records":
+                        self.load_stats[key] = self.load_stats.get(key, 0) + value
+
+                    # end if
+                # end for
+            # end for
+        # end try
+        return records
+
+    # end def
+
+
+    def _put(self, feed, writer, item):
+        """Queue item for a target's writer, dropped once the writer is gone so a failed target never blocks the rest."""
+
+        while writer.is_alive():
+            try:
+                feed.put(item, timeout=0.5)
+                return
+
+            except queue.Full:
+                continue
+
+            # end try
+        # end while
+    # end def
+
+
+    def _write(self, label, backend, feed, batch_size, prune_module):
+        """Writer thread of one target, runs the target's own load loop over the records coming through feed."""
+
+        def records():
+            while True:
+                item = feed.get()
+                if item is _DONE:
+                    return
+
+                # end if
+                if isinstance(item, BaseException):
+                    raise item
+
+                # end if
+                yield from item
+
+            # end while
+        # end def
+
+        try:
+            backend.insert_oid_metadata(records(), batch_size, prune_module)
+            stats = backend.stats
+            self.logger.info(f"Target {label}: {stats.get('records', 0)} records, {stats.get('failed_batches', 0)} failed batches")
+
+        except Exception as e:
+            # Counted as a failed batch, so the load is not recorded in this target's manifest
+            backend.load_stats["failed_batches"] = backend.load_stats.get("failed_batches", 0) + 1
+            self.logger.error(f"Target {label} failed, the other targets carry on: {e}")
+
+        # end try
+    # end def
+# end class
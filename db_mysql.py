@@ -0,0 +1,409 @@
+#######################################################################################################################
+#
+#
+#  	Project     	: 	SNMP MIB Parser
+#
+#   File            :   db_mysql.py
+#
+#   Description     :   MySQL backend, batches are written as multi row INSERT ... ON DUPLICATE KEY UPDATE statements
+#                   :   sized to max_allowed_packet, or (opt-in) via LOAD DATA LOCAL INFILE into a staging table.
+#
+#	By              :   George Leonard ( georgelza@gmail.com )
+#
+#   Created     	:   05 Jul 2025
+#
+#
+########################################################################################################################
+__author__      = "George Leonard"
+__email__       = "georgelza@gmail.com"
+__version__     = "0.0.1"
+__copyright__   = "Copyright 2025, George Leonard"
+
+
+import os, tempfile, time
+import mysql.connector
+
+from db_base import DatabaseBackend, KEYED_TABLES, MANIFEST_COLUMNS, ROW_HASH_COLUMN, copy_text_value, keyed_row_values, keyed_table_ddl
+
+
+# Per session staging table LOAD DATA batches are bulk loaded into before the set based upsert
+MYSQL_STAGE_TABLE   = "snmp_oid_stage"
+
+# Used when @@max_allowed_packet can not be read, the server default up to MySQL 5.7
+MYSQL_DEFAULT_PACKET = 4 * 1024 * 1024
+
+# errnos of LOAD DATA LOCAL INFILE being disabled or refused: ER_NOT_ALLOWED_COMMAND (1148),
+# CR_LOAD_DATA_LOCAL_INFILE_REJECTED (2068) and ER_CLIENT_LOCAL_FILES_DISABLED (3948)
+LOCAL_INFILE_REFUSED = (1148, 2068, 3948)
+
+
+class MySQLBackend(DatabaseBackend):
+
+    db_type = 'mysql'
+
+    def __init__(self, **kwargs):
+
+        super().__init__(**kwargs)
+        self.mysql_max_packet   = MYSQL_DEFAULT_PACKET      # @@max_allowed_packet of the server
+
+    # end def
+
+
+    def connect(self):
+        """Establishes a connection to the MySQL database."""
+        try:
+            self.connection = mysql.connector.connect(
+                host                = self.host,
+                port                = self.port,
+                user                = self.user,
+                password            = self.password,
+                database            = self.dbname,
+                allow_local_infile  = self.mysql_local_infile
+            )
+
+            self.cursor = self.connection.cursor()
+            self.logger.info(f"Connected to MySQL database: {self.dbname} on {self.host}:{self.port}")
+
+            # Multi row INSERT statements are sized to stay under the server's packet limit
+            try:
+                self.cursor.execute("SELECT @@max_allowed_packet")
+                self.mysql_max_packet = int(self.cursor.fetchone()[0])
+
+            except Exception as e:
+                self.logger.warning(f"Could not read MySQL max_allowed_packet, assuming {MYSQL_DEFAULT_PACKET} bytes: {e}")
+
+            # end try
+            self.logger.info(f"MySQL max_allowed_packet: {self.mysql_max_packet} bytes")
+
+            # MySQL has no ADD COLUMN IF NOT EXISTS
+            if self.changed_only:
+                self.cursor.execute("""
+                    SELECT COUNT(*) FROM information_schema.COLUMNS
+                    WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s
+                """, (self.tbl_name, ROW_HASH_COLUMN))
+                if not self.cursor.fetchone()[0]:
+                    try:
+                        self.cursor.execute(f"ALTER TABLE {self.tbl_name} ADD COLUMN {ROW_HASH_COLUMN} CHAR(40)")
+                        self.logger.info(f"Added {ROW_HASH_COLUMN} column to MySQL table '{self.tbl_name}'")
+
+                    except mysql.connector.Error as e:
+                        raise RuntimeError(f"Could not add the {ROW_HASH_COLUMN} column --manifest needs to '{self.tbl_name}', add it (see TableExamples) or run without --manifest: {e}") from e
+
+                    # end try
+                # end if
+            # end if
+
+            if self.manifest_name:
+                self.cursor.execute(f"""
+                    CREATE TABLE IF NOT EXISTS {self.manifest_name} (
+                         mib_module         VARCHAR(255) PRIMARY KEY
+                        ,source_hash        CHAR(64)     NOT NULL
+                        ,parser_version     VARCHAR(32)  NOT NULL
+                        ,row_count          INTEGER      NOT NULL
+                        ,loaded_at          TIMESTAMP    NOT NULL
+                    );
+                """)
+
+            # end if
+            for kind, table in self.keyed_tables.items():
+                self.cursor.execute(keyed_table_ddl(kind, table))
+
+            # end for
+        except Exception as e:
+            self.logger.error(f"Error connecting to {self.db_type} database: {e}")
+            self.connection = None
+            self.cursor     = None
+            raise
+
+        # end try
+    # end def
+
+
+    def read_hashes(self, batch):
+        """Stored row hashes of the records in batch, {oid_string: row_hash}."""
+
+        try:
+            self.cursor.execute(f"SELECT oid_string, {ROW_HASH_COLUMN} FROM {self.tbl_name} WHERE oid_string IN ({', '.join(['%s'] * len(batch))})",
+                                [oid['oid_string'] for oid in batch])
+            stored = dict(self.cursor.fetchall())
+            self.connection.commit()
+            return stored
+
+        except Exception as e:
+            self.logger.warning(f"Could not read stored row hashes from MySQL, writing the whole batch: {e}")
+            self.connection.rollback()
+            return {}
+
+        # end try
+    # end def
+
+
+    def delete(self, mib_module, keep):
+        """Delete the rows of mib_module whose OID is not in keep, returns the number deleted."""
+
+        try:
+            self.cursor.execute(f"SELECT oid_string FROM {self.tbl_name} WHERE mib_module = %s", (mib_module,))
+            stale = [row[0] for row in self.cursor.fetchall() if row[0] not in keep]
+            for i in range(0, len(stale), self.batch_size):
+                chunk = stale[i:i + self.batch_size]
+                self.cursor.execute(f"DELETE FROM {self.tbl_name} WHERE mib_module = %s AND oid_string IN ({', '.join(['%s'] * len(chunk))})",
+                                    [mib_module] + chunk)
+
+            # end for
+            self.connection.commit()
+            return len(stale)
+
+        except Exception as e:
+            self.logger.error(f"Error deleting removed {mib_module} OIDs from MySQL table '{self.tbl_name}': {e}")
+            self.connection.rollback()
+            return 0
+
+        # end try
+    # end def
+
+
+    def load_manifest(self):
+
+        if not self.connection or not self.manifest_name:
+            return {}
+
+        # end if
+
+        try:
+            self.cursor.execute(f"SELECT {', '.join(MANIFEST_COLUMNS)} FROM {self.manifest_name}")
+            rows = self.cursor.fetchall()
+            self.connection.commit()
+            return {row[0]: dict(zip(MANIFEST_COLUMNS[1:], row[1:])) for row in rows}
+
+        except Exception as e:
+            self.logger.warning(f"Could not read load manifest '{self.manifest_name}', loading everything: {e}")
+            self.connection.rollback()
+            return {}
+
+        # end try
+    # end def
+
+
+    def update_manifest(self, mib_module, source_hash, parser_version, row_count):
+
+        if not self.connection or not self.manifest_name:
+            return
+
+        # end if
+
+        try:
+            self.cursor.execute(f"""
+                INSERT INTO {self.manifest_name} (mib_module, source_hash, parser_version, row_count, loaded_at)
+                VALUES (%s, %s, %s, %s, CURRENT_TIMESTAMP)
+                ON DUPLICATE KEY UPDATE
+                    source_hash     = VALUES(source_hash),
+                    parser_version  = VALUES(parser_version),
+                    row_count       = VALUES(row_count),
+                    loaded_at       = VALUES(loaded_at);
+            """, (mib_module, source_hash, parser_version, row_count))
+            self.connection.commit()
+            self.logger.info(f"Load manifest updated for {mib_module}: {row_count} OIDs, source hash {source_hash[:12]}")
+
+        except Exception as e:
+            self.logger.error(f"Error updating load manifest '{self.manifest_name}' for {mib_module}: {e}")
+            self.connection.rollback()
+
+        # end try
+    # end def
+
+
+    def keyed_rows_empty(self, kind):
+
+        table = self.keyed_tables.get(kind)
+        if not self.connection or not table:
+            return False
+
+        # end if
+
+        try:
+            self.cursor.execute(f"SELECT 1 FROM {table} LIMIT 1")
+            empty = self.cursor.fetchone() is None
+            self.connection.commit()
+            return empty
+
+        except Exception as e:
+            self.logger.warning(f"Could not read '{table}': {e}")
+            self.connection.rollback()
+            return True
+
+        # end try
+    # end def
+
+
+    def store_keyed_rows(self, kind, rows, prune_module=None):
+        """Replace the rows of prune_module and upsert rows, committed together."""
+
+        table   = self.keyed_tables[kind]
+        columns = KEYED_TABLES[kind][0]
+        updates = ",\n                ".join(f"{col:<15} = VALUES({col})" for col in columns[1:])
+        sql     = f"""
+            INSERT INTO {table} ({", ".join(columns)})
+            VALUES ({", ".join(["%s"] * len(columns))})
+            ON DUPLICATE KEY UPDATE
+                {updates};
+        """
+
+        try:
+            if prune_module:
+                self.cursor.execute(f"DELETE FROM {table} WHERE mib_module = %s", (prune_module,))
+
+            # end if
+            if rows:
+                # The connector sends an executemany of a single row INSERT as multi row statements
+                self.cursor.executemany(sql, [keyed_row_values(kind, row) for row in rows])
+
+            # end if
+            self.connection.commit()
+            return True
+
+        except Exception as e:
+            self.logger.error(f"Error writing {kind.replace('_', ' ')} into MySQL table '{table}': {e}")
+            self.connection.rollback()
+            return False
+
+        # end try
+    # end def
+
+
+    def bulk_upsert(self, batch):
+        """
+        Write one batch as multi row INSERT ... ON DUPLICATE KEY UPDATE statements, each kept under the server's
+        max_allowed_packet, committed together. With mysql_local_infile the batch is instead written to a temp
+        file, loaded into a staging table with LOAD DATA LOCAL INFILE and upserted from there.
+        """
+
+        # For MySQL, schema is part of the database connection, not table name directly in query
+        rows    = [self._row(oid) for oid in batch]
+        start   = time.perf_counter()
+        try:
+            if self.mysql_local_infile:
+                try:
+                    self._load_data(rows)
+
+                except mysql.connector.Error as e:
+                    # Only LOCAL INFILE being disabled or refused (client or server side) turns it off, any other
+                    # error (missing table / column, permissions, lost connection) fails this batch and it stays on
+                    if e.errno not in LOCAL_INFILE_REFUSED:
+                        raise
+
+                    # end if
+                    self.logger.warning(f"LOAD DATA LOCAL INFILE into MySQL refused ({e}), falling back to multi row INSERT.")
+                    self.connection.rollback()
+                    self.mysql_local_infile = False
+
+                # end try
+            # end if
+
+            if not self.mysql_local_infile:
+                self._insert_values(rows)
+
+            # end if
+            self.connection.commit()
+
+            elapsed = time.perf_counter() - start
+            self.logger.info(f"MySQL batch of {len(rows)} OIDs written to '{self.tbl_name}' in {elapsed:.3f}s "
+                             f"({len(rows) / elapsed if elapsed > 0 else 0:.0f} rows/sec).")
+            return True
+
+        except Exception as e:
+            self.logger.error(f"Error inserting into MySQL table '{self.tbl_name}': {e}")
+            self.connection.rollback()
+            return False
+
+        # end try
+    # end def
+
+
+    def _insert_values(self, rows):
+        """Upsert rows with as few multi row INSERT statements as max_allowed_packet allows, caller commits."""
+
+        columns     = ", ".join(self.columns)
+        updates     = ",\n                ".join(f"{col:<15} = VALUES({col})" for col in self.columns[1:])
+        row_sql     = "(" + ", ".join(["%s"] * len(self.columns)) + ")"
+        prefix      = f"INSERT INTO {self.tbl_name} ({columns}) VALUES "
+        suffix      = f"""
+            ON DUPLICATE KEY UPDATE
+                {updates};
+        """
+
+        # Every value may double in size when escaped, plus quotes and separators, keep 10% headroom
+        budget      = int(self.mysql_max_packet * 0.9) - len(prefix) - len(suffix)
+        statement   = []
+        size        = 0
+
+        for row in rows:
+            row_size = sum(2 * len(str(value).encode('utf-8')) + 3 for value in row) + 4
+            if statement and size + row_size > budget:
+                self._execute_values(prefix, row_sql, suffix, statement)
+                statement   = []
+                size        = 0
+
+            # end if
+            statement.append(row)
+            size += row_size
+
+        # end for
+
+        if statement:
+            self._execute_values(prefix, row_sql, suffix, statement)
+
+        # end if
+    # end def
+
+
+    def _execute_values(self, prefix, row_sql, suffix, rows):
+
+        sql     = prefix + ", ".join([row_sql] * len(rows)) + suffix
+        params  = [value for row in rows for value in row]
+        self.cursor.execute(sql, params)
+
+    # end def
+
+
+    def _load_data(self, rows):
+        """LOAD DATA LOCAL INFILE rows into the session's staging table and upsert them, caller commits."""
+
+        columns = ", ".join(self.columns)
+        updates = ",\n                ".join(f"{col:<15} = s.{col}" for col in self.columns[1:])
+
+        # Temporary, so private to this session, same column definitions as the target table
+        self.cursor.execute(f"CREATE TEMPORARY TABLE IF NOT EXISTS {MYSQL_STAGE_TABLE} LIKE {self.tbl_name}")
+        self.cursor.execute(f"DELETE FROM {MYSQL_STAGE_TABLE}")
+
+        fd, tmp_file = tempfile.mkstemp(suffix=".tsv")
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8', newline='\n') as f:
+                for row in rows:
+                    f.write("\t".join(copy_text_value(value) for value in row))
+                    f.write("\n")
+
+                # end for
+            # end with
+
+            # LOCAL loads skip duplicate keys, REPLACE makes the last occurrence of an OID in the batch win
+            self.cursor.execute(f"""
+                LOAD DATA LOCAL INFILE %s
+                REPLACE INTO TABLE {MYSQL_STAGE_TABLE}
+                CHARACTER SET utf8mb4
+                ({columns})
+            """, (tmp_file,))
+
+        finally:
+            os.remove(tmp_file)
+
+        # end try
+
+        self.cursor.execute(f"""
+            INSERT INTO {self.tbl_name} ({columns})
+            SELECT {", ".join(f"s.{col}" for col in self.columns)} FROM {MYSQL_STAGE_TABLE} AS s
+            ON DUPLICATE KEY UPDATE
+                {updates};
+        """)
+
+    # end def
+# end class
@@ -0,0 +1,371 @@
+#######################################################################################################################
+#
+#
+#  	Project     	: 	SNMP MIB Parser
+#
+#   File            :   db_postgresql.py
+#
+#   Description     :   PostgreSQL backend, batches are COPY'd into a per session staging table and upserted from
+#                   :   there with one INSERT ... SELECT ... ON CONFLICT (execute_values where COPY is unavailable).
+#
+#	By              :   George Leonard ( georgelza@gmail.com )
+#
+#   Created     	:   05 Jul 2025
+#
+#
+########################################################################################################################
+__author__      = "George Leonard"
+__email__       = "georgelza@gmail.com"
+__version__     = "0.0.1"
+__copyright__   = "Copyright 2025, George Leonard"
+
+
+import io
+import psycopg2
+import psycopg2.extras
+
+from db_base import DatabaseBackend, KEYED_TABLES, MANIFEST_COLUMNS, ROW_HASH_COLUMN, copy_text_value, keyed_row_values, keyed_table_ddl
+
+
+# Per session staging table the batches are bulk loaded into before the set based upsert
+PG_STAGE_TABLE  = "snmp_oid_stage"
+
+
+class PostgreSQLBackend(DatabaseBackend):
+
+    db_type = 'postgresql'
+
+    def __init__(self, **kwargs):
+
+        super().__init__(**kwargs)
+        self.pg_copy    = True          # Bulk load via COPY, falls back to execute_values when unavailable
+        self.pg_stage   = False         # Staging table created in this session
+
+    # end def
+
+
+    def connect(self):
+        """Establishes a connection to the PostgreSQL database."""
+        try:
+            self.connection = psycopg2.connect(
+                host    = self.host,
+                port    = self.port,
+                user    = self.user,
+                password= self.password,
+                dbname  = self.dbname
+            )
+
+            self.connection.autocommit  = False # Every batch is written in a single transaction
+            self.cursor                 = self.connection.cursor()
+
+            self.logger.info(f"Connected to PostgreSQL database: {self.dbname} on {self.host}:{self.port}")
+
+            if self.schema:
+                self.cursor.execute(f"SET search_path TO {self.schema}, public;")
+                self.logger.info(f"PostgreSQL search_path set to: {self.schema}, public")
+
+            # end if
+            if self.changed_only:
+                self._add_row_hash_column()
+
+            # end if
+            if self.manifest_name:
+                self.cursor.execute(f"""
+                    CREATE TABLE IF NOT EXISTS {self._table_name(self.manifest_name)} (
+                         mib_module         VARCHAR(255) PRIMARY KEY
+                        ,source_hash        CHAR(64)     NOT NULL
+                        ,parser_version     VARCHAR(32)  NOT NULL
+                        ,row_count          INTEGER      NOT NULL
+                        ,loaded_at          TIMESTAMP    NOT NULL
+                    );
+                """)
+
+            # end if
+            for kind, table in self.keyed_tables.items():
+                self.cursor.execute(keyed_table_ddl(kind, self._table_name(table)))
+
+            # end for
+            self.connection.commit()
+
+        except Exception as e:
+            self.logger.error(f"Error connecting to {self.db_type} database: {e}")
+            self.connection = None
+            self.cursor     = None
+            raise
+
+        # end try
+    # end def
+
+
+    def _add_row_hash_column(self):
+        """
+        Add the row_hash column change detection needs, when the table does not have it yet. ALTER TABLE needs the
+        table's owner even for a column that exists, so it is only run when the column is missing.
+        """
+
+        table = self._table_name(self.tbl_name)
+        # Unquoted identifiers are folded to lower case, an unqualified table is looked up in the first search_path schema
+        self.cursor.execute("SELECT COUNT(*) FROM information_schema.columns WHERE table_schema = COALESCE(%s, current_schema()) AND table_name = %s AND column_name = %s",
+                            (self.schema.lower() if self.schema else None, self.tbl_name.lower(), ROW_HASH_COLUMN))
+        if self.cursor.fetchone()[0]:
+            return
+
+        # end if
+        try:
+            self.cursor.execute(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {ROW_HASH_COLUMN} CHAR(40);")
+            self.logger.info(f"Added {ROW_HASH_COLUMN} column to PostgreSQL table '{table}'")
+
+        except psycopg2.Error as e:
+            raise RuntimeError(f"Could not add the {ROW_HASH_COLUMN} column --manifest needs to '{table}', add it (see TableExamples) or run without --manifest: {e}") from e
+
+        # end try
+    # end def
+
+
+    def read_hashes(self, batch):
+        """Stored row hashes of the records in batch, {oid_string: row_hash}."""
+
+        try:
+            self.cursor.execute(f"SELECT oid_string, {ROW_HASH_COLUMN} FROM {self._table_name(self.tbl_name)} WHERE oid_string = ANY(%s)",
+                                ([oid['oid_string'] for oid in batch],))
+            stored = dict(self.cursor.fetchall())
+            self.connection.commit()
+            return stored
+
+        except Exception as e:
+            self.logger.warning(f"Could not read stored row hashes from PostgreSQL, writing the whole batch: {e}")
+            self.connection.rollback()
+            return {}
+
+        # end try
+    # end def
+
+
+    def delete(self, mib_module, keep):
+        """Delete the rows of mib_module whose OID is not in keep, returns the number deleted."""
+
+        table_full_name = self._table_name(self.tbl_name)
+        try:
+            self.cursor.execute(f"SELECT oid_string FROM {table_full_name} WHERE mib_module = %s", (mib_module,))
+            stale = [row[0] for row in self.cursor.fetchall() if row[0] not in keep]
+            if stale:
+                self.cursor.execute(f"DELETE FROM {table_full_name} WHERE mib_module = %s AND oid_string = ANY(%s)", (mib_module, stale))
+
+            # end if
+            self.connection.commit()
+            return len(stale)
+
+        except Exception as e:
+            self.logger.error(f"Error deleting removed {mib_module} OIDs from PostgreSQL table '{table_full_name}': {e}")
+            self.connection.rollback()
+            return 0
+
+        # end try
+    # end def
+
+
+    def load_manifest(self):
+
+        if not self.connection or not self.manifest_name:
+            return {}
+
+        # end if
+
+        try:
+            self.cursor.execute(f"SELECT {', '.join(MANIFEST_COLUMNS)} FROM {self._table_name(self.manifest_name)}")
+            rows = self.cursor.fetchall()
+            self.connection.commit()
+            return {row[0]: dict(zip(MANIFEST_COLUMNS[1:], row[1:])) for row in rows}
+
+        except Exception as e:
+            self.logger.warning(f"Could not read load manifest '{self.manifest_name}', loading everything: {e}")
+            self.connection.rollback()
+            return {}
+
+        # end try
+    # end def
+
+
+    def update_manifest(self, mib_module, source_hash, parser_version, row_count):
+
+        if not self.connection or not self.manifest_name:
+            return
+
+        # end if
+
+        try:
+            self.cursor.execute(f"""
+                INSERT INTO {self._table_name(self.manifest_name)} (mib_module, source_hash, parser_version, row_count, loaded_at)
+                VALUES (%s, %s, %s, %s, now())
+                ON CONFLICT (mib_module) DO UPDATE SET
+                     source_hash        = EXCLUDED.source_hash
+                    ,parser_version     = EXCLUDED.parser_version
+                    ,row_count          = EXCLUDED.row_count
+                    ,loaded_at          = EXCLUDED.loaded_at;
+            """, (mib_module, source_hash, parser_version, row_count))
+            self.connection.commit()
+            self.logger.info(f"Load manifest updated for {mib_module}: {row_count} OIDs, source hash {source_hash[:12]}")
+
+        except Exception as e:
+            self.logger.error(f"Error updating load manifest '{self.manifest_name}' for {mib_module}: {e}")
+            self.connection.rollback()
+
+        # end try
+    # end def
+
+
+    def keyed_rows_empty(self, kind):
+
+        table = self.keyed_tables.get(kind)
+        if not self.connection or not table:
+            return False
+
+        # end if
+
+        try:
+            self.cursor.execute(f"SELECT 1 FROM {self._table_name(table)} LIMIT 1")
+            empty = self.cursor.fetchone() is None
+            self.connection.commit()
+            return empty
+
+        except Exception as e:
+            self.logger.warning(f"Could not read '{table}': {e}")
+            self.connection.rollback()
+            return True
+
+        # end try
+    # end def
+
+
+    def store_keyed_rows(self, kind, rows, prune_module=None):
+        """Replace the rows of prune_module and upsert rows with execute_values, one transaction."""
+
+        table_full_name = self._table_name(self.keyed_tables[kind])
+        columns         = KEYED_TABLES[kind][0]
+        updates         = "\n                ,".join(f"{col:<18} = EXCLUDED.{col}" for col in columns[1:])
+
+        # ON CONFLICT can not touch the same row twice in one statement, last occurrence of an OID wins
+        values          = list({row['oid_string']: keyed_row_values(kind, row) for row in rows}.values())
+
+        try:
+            if prune_module:
+                self.cursor.execute(f"DELETE FROM {table_full_name} WHERE mib_module = %s", (prune_module,))
+
+            # end if
+            if values:
+                psycopg2.extras.execute_values(self.cursor, f"""
+                    INSERT INTO {table_full_name} ({", ".join(columns)})
+                    VALUES %s
+                    ON CONFLICT (oid_string) DO UPDATE SET
+                         {updates};
+                """, values, page_size=self.batch_size)
+
+            # end if
+            self.connection.commit()
+            return True
+
+        except Exception as e:
+            self.logger.error(f"Error writing {kind.replace('_', ' ')} into PostgreSQL table '{table_full_name}': {e}")
+            if not self.connection.closed:
+                self.connection.rollback()
+
+            # end if
+            return False
+
+        # end try
+    # end def
+
+
+    def bulk_upsert(self, batch):
+        """
+        Write one batch in a single transaction: COPY it into the session's staging table and upsert from there
+        with one INSERT ... SELECT ... ON CONFLICT. Where COPY is not available (e.g. behind some poolers) the
+        batch is sent as one multi row INSERT via execute_values instead.
+        """
+
+        table_full_name = self._table_name(self.tbl_name)
+        columns         = ", ".join(self.columns)
+        updates         = "\n                ,".join(f"{col:<18} = EXCLUDED.{col}" for col in self.columns[1:])
+
+        # ON CONFLICT can not touch the same row twice in one statement, last occurrence of an OID wins
+        rows = list({oid['oid_string']: self._row(oid) for oid in batch}.values())
+
+        try:
+            if self.pg_copy:
+                try:
+                    self._copy(rows, table_full_name, columns, updates)
+
+                except psycopg2.NotSupportedError as e:
+                    # Only COPY being refused (SQLSTATE class 0A, feature not supported) turns it off, any other
+                    # error (missing table / column, permissions, lost connection) fails this batch and COPY stays on
+                    if self.connection.closed:
+                        raise
+
+                    # end if
+                    self.logger.warning(f"COPY into PostgreSQL staging table not supported ({e}), falling back to execute_values.")
+                    self.connection.rollback()
+                    self.pg_copy    = False
+                    self.pg_stage   = False
+
+                # end try
+            # end if
+
+            if not self.pg_copy:
+                sql = f"""
+                    INSERT INTO {table_full_name} ({columns})
+                    VALUES %s
+                    ON CONFLICT (oid_string) DO UPDATE SET
+                         {updates};
+                """
+                psycopg2.extras.execute_values(self.cursor, sql, rows, page_size=len(rows))
+
+            # end if
+            self.connection.commit()
+            self.logger.debug(f"Successfully inserted/updated {len(rows)} OIDs into PostgreSQL table '{table_full_name}'.")
+            return True
+
+        except Exception as e:
+            self.logger.error(f"Error inserting into PostgreSQL table '{table_full_name}': {e}")
+            if not self.connection.closed:
+                self.connection.rollback()
+
+            # end if
+            self.pg_stage = False           # Created in the rolled back transaction
+            return False
+
+        # end try
+    # end def
+
+
+    def _copy(self, rows, table_full_name, columns, updates):
+        """COPY rows into the staging table and upsert them into the target table, caller commits."""
+
+        if not self.pg_stage:
+            # Temporary, so private to this session, and emptied by every commit
+            self.cursor.execute(f"""
+                CREATE TEMPORARY TABLE IF NOT EXISTS {PG_STAGE_TABLE} (
+                    {", ".join(f"{col} TEXT" for col in self.columns)}
+                ) ON COMMIT DELETE ROWS;
+            """)
+            self.pg_stage = True
+
+        # end if
+
+        buffer = io.StringIO()
+        for row in rows:
+            buffer.write("\t".join(copy_text_value(value) for value in row))
+            buffer.write("\n")
+
+        # end for
+        buffer.seek(0)
+        self.cursor.copy_expert(f"COPY {PG_STAGE_TABLE} ({columns}) FROM STDIN", buffer)
+
+        self.cursor.execute(f"""
+            INSERT INTO {table_full_name} ({columns})
+            SELECT {columns} FROM {PG_STAGE_TABLE}
+            ON CONFLICT (oid_string) DO UPDATE SET
+                 {updates};
+        """)
+
+    # end def
+# end class
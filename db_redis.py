@@ -0,0 +1,293 @@
+#######################################################################################################################
+#
+#
+#  	Project     	: 	SNMP MIB Parser
+#
+#   File            :   db_redis.py
+#
+#   Description     :   Redis backend, one JSON string key per OID, batches written in pipeline chunks of at most
+#                   :   --batch-size commands each (a SET per record, plus the HSET of its row hash with --manifest).
+#
+#                   :   Every keyed table (value maps, table indexes) is one hash (field = oid, value = JSON), a
+#                   :   stream decoding values needs one HGET per object, plus a per module set of the OIDs in it,
+#                   :   so a reload can drop the stale ones.
+#
+#	By              :   George Leonard ( georgelza@gmail.com )
+#
+#   Created     	:   05 Jul 2025
+#
+#
+########################################################################################################################
+__author__      = "George Leonard"
+__email__       = "georgelza@gmail.com"
+__version__     = "0.0.1"
+__copyright__   = "Copyright 2025, George Leonard"
+
+
+import json, time
+from datetime import datetime, timezone
+import redis
+
+from db_base import DatabaseBackend, KEYED_TABLES, row_hash
+
+
+# Per module hash of oid_string -> row hash, the Redis equivalent of the row_hash column. Under the key prefix, so
+# loads with different key prefixes into one database keep their own row hashes
+REDIS_ROW_HASH_KEY = "{prefix}row_hash:{module}"
+
+# Per module set of the OIDs in a keyed table hash
+REDIS_KEYED_MODULE_KEY = "{name}:{module}"
+
+
+class RedisBackend(DatabaseBackend):
+
+    db_type = 'redis'
+
+    def connect(self):
+        """Establishes a connection to the Redis database."""
+        try:
+            self.connection = redis.Redis(
+                host     = self.host,
+                port     = self.port,
+                db       = self.dbname,     # In Redis, 'database' is an integer index
+                password = self.password
+            )
+
+            self.connection.ping()          # Test connection
+            self.logger.info(f"Connected to Redis database: {self.dbname} on {self.host}:{self.port}")
+
+        except Exception as e:
+            self.logger.error(f"Error connecting to {self.db_type} database: {e}")
+            self.connection = None
+            raise
+
+        # end try
+    # end def
+
+
+    def read_hashes(self, batch):
+        """Stored row hashes of the records in batch, {oid_string: row_hash}, from the per module hashes."""
+
+        by_module = {}
+        for oid in batch:
+            by_module.setdefault(oid['mib_module'], []).append(oid['oid_string'])
+
+        # end for
+
+        try:
+            pipe = self.connection.pipeline(transaction=False)
+            for module, oid_strings in by_module.items():
+                pipe.hmget(REDIS_ROW_HASH_KEY.format(prefix=self.key_prefix, module=module), oid_strings)
+
+            # end for
+            stored = {}
+            for oid_strings, hashes in zip(by_module.values(), pipe.execute()):
+                stored.update((oid_string, value.decode('utf-8')) for oid_string, value in zip(oid_strings, hashes) if value is not None)
+
+            # end for
+            return stored
+
+        except Exception as e:
+            self.logger.warning(f"Could not read stored row hashes from Redis, writing the whole batch: {e}")
+            return {}
+
+        # end try
+    # end def
+
+
+    def delete(self, mib_module, keep):
+        """Delete the keys of mib_module whose OID is not in keep, returns the number deleted."""
+
+        hash_key = REDIS_ROW_HASH_KEY.format(prefix=self.key_prefix, module=mib_module)
+        try:
+            stale = [field.decode('utf-8') for field in self.connection.hkeys(hash_key)]
+            stale = [oid_string for oid_string in stale if oid_string not in keep]
+            deleted = 0
+            for i in range(0, len(stale), self.batch_size):
+                chunk   = stale[i:i + self.batch_size]
+                keys    = [f"{self.key_prefix}{oid_string}" for oid_string in chunk]
+
+                # A key rewritten by another module since (its object moved) is only dropped from this module's hash
+                owned   = [key for key, value in zip(keys, self.connection.mget(keys))
+                           if value is not None and json.loads(value).get('mib_module') == mib_module]
+
+                pipe    = self.connection.pipeline(transaction=self.redis_transaction)
+                if owned:
+                    pipe.delete(*owned)
+
+                # end if
+                pipe.hdel(hash_key, *chunk)
+                pipe.execute()
+                deleted += len(owned)
+
+            # end for
+            return deleted
+
+        except Exception as e:
+            self.logger.error(f"Error deleting removed {mib_module} OIDs from Redis: {e}")
+            return 0
+
+        # end try
+    # end def
+
+
+    def load_manifest(self):
+
+        if not self.connection or not self.manifest_name:
+            return {}
+
+        # end if
+
+        try:
+            return {name.decode('utf-8'): json.loads(value) for name, value in self.connection.hgetall(self.manifest_name).items()}
+
+        except Exception as e:
+            self.logger.warning(f"Could not read load manifest '{self.manifest_name}', loading everything: {e}")
+            return {}
+
+        # end try
+    # end def
+
+
+    def update_manifest(self, mib_module, source_hash, parser_version, row_count):
+
+        if not self.connection or not self.manifest_name:
+            return
+
+        # end if
+
+        try:
+            self.connection.hset(self.manifest_name, mib_module, json.dumps({
+                 "source_hash":     source_hash
+                ,"parser_version":  parser_version
+                ,"row_count":       row_count
+                ,"loaded_at":       datetime.now(timezone.utc).isoformat()
+            }))
+            self.logger.info(f"Load manifest updated for {mib_module}: {row_count} OIDs, source hash {source_hash[:12]}")
+
+        except Exception as e:
+            self.logger.error(f"Error updating load manifest '{self.manifest_name}' for {mib_module}: {e}")
+
+        # end try
+    # end def
+
+
+    def keyed_rows_empty(self, kind):
+
+        name = self.keyed_tables.get(kind)
+        if not self.connection or not name:
+            return False
+
+        # end if
+
+        try:
+            return not self.connection.exists(name)
+
+        except Exception as e:
+            self.logger.warning(f"Could not read '{name}': {e}")
+            return True
+
+        # end try
+    # end def
+
+
+    def store_keyed_rows(self, kind, rows, prune_module=None):
+        """HSET the rows into the keyed table's hash, dropping the fields of prune_module that are no longer in rows."""
+
+        name    = self.keyed_tables[kind]
+        columns = KEYED_TABLES[kind][0]
+        try:
+            pipe = self.connection.pipeline(transaction=self.redis_transaction)
+            if prune_module:
+                module_key  = REDIS_KEYED_MODULE_KEY.format(name=name, module=prune_module)
+                keep        = {row['oid_string'] for row in rows if row['mib_module'] == prune_module}
+                stale       = [field.decode('utf-8') for field in self.connection.smembers(module_key)]
+                stale       = [oid_string for oid_string in stale if oid_string not in keep]
+                if stale:
+                    pipe.hdel(name, *stale)
+                    pipe.srem(module_key, *stale)
+
+                # end if
+            # end if
+
+            by_module = {}
+            for row in rows:
+                by_module.setdefault(row['mib_module'], []).append(row['oid_string'])
+
+            # end for
+            if rows:
+                pipe.hset(name, mapping={row['oid_string']: json.dumps({col: row[col] for col in columns[1:]}) for row in rows})
+
+            # end if
+            for module, oid_strings in by_module.items():
+                pipe.sadd(REDIS_KEYED_MODULE_KEY.format(name=name, module=module), *oid_strings)
+
+            # end for
+            pipe.execute()
+            return True
+
+        except Exception as e:
+            self.logger.error(f"Error writing {kind.replace('_', ' ')} into Redis hash '{name}': {e}")
+            return False
+
+        # end try
+    # end def
+
+
+    def bulk_upsert(self, batch):
+        """
+        Write one batch in pipeline chunks of at most batch_size commands, so the client only ever buffers
+        batch_size commands and the server answers batch_size replies at a time (with changed_only every record
+        takes two, its SET and the HSET of its row hash). True when every chunk was written.
+        """
+
+        per_chunk   = max(1, self.batch_size // (2 if self.changed_only else 1))
+        written     = True
+        for start in range(0, len(batch), per_chunk):
+            written = self._write_chunk(batch[start:start + per_chunk]) and written
+
+        # end for
+        return written
+
+    # end def
+
+
+    def _write_chunk(self, chunk):
+        """
+        Write the records of chunk as one pipeline, with redis_transaction as MULTI/EXEC. A chunk that fails on a
+        connection error or timeout is resent (SET and HSET are idempotent) up to redis_retries times.
+        """
+
+        for attempt in range(self.redis_retries + 1):
+            try:
+                pipe = self.connection.pipeline(transaction=self.redis_transaction)
+                for oid in chunk:
+                    redis_key = f"{self.key_prefix}{oid['oid_string']}"
+                    pipe.set(redis_key, json.dumps(oid))
+                    if self.changed_only:
+                        pipe.hset(REDIS_ROW_HASH_KEY.format(prefix=self.key_prefix, module=oid['mib_module']), oid['oid_string'], row_hash(oid))
+
+                    # end if
+                # end for
+                pipe.execute()
+                self.logger.debug(f"Successfully inserted/updated {len(chunk)} OIDs into Redis (keys prefixed with '{self.key_prefix}').")
+                return True
+
+            except (redis.exceptions.ConnectionError, redis.exceptions.TimeoutError) as e:
+                if attempt == self.redis_retries:
+                    self.logger.error(f"Error inserting into Redis, giving up on chunk of {len(chunk)} OIDs after {attempt + 1} attempt(s): {e}")
+                    return False
+
+                # end if
+                delay = 0.5 * 2 ** attempt
+                self.logger.warning(f"Error inserting into Redis ({e}), retrying chunk of {len(chunk)} OIDs in {delay:.1f}s.")
+                time.sleep(delay)
+
+            except Exception as e:
+                self.logger.error(f"Error inserting into Redis: {e}")
+                return False
+
+            # end try
+        # end for
+    # end def
+# end class
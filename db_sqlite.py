@@ -0,0 +1,274 @@
+#######################################################################################################################
+#
+#
+#  	Project     	: 	SNMP MIB Parser
+#
+#   File            :   db_sqlite.py
+#
+#   Description     :   SQLite backend, a local file target with no server and no driver to install.
+#
+#                   :   The database runs in WAL mode with synchronous=NORMAL, every batch is one executemany of
+#                   :   INSERT ... ON CONFLICT DO UPDATE inside a single transaction. The OID, manifest and keyed
+#                   :   tables are created on connect. --db-name is the database file.
+#
+#	By              :   George Leonard ( georgelza@gmail.com )
+#
+#   Created     	:   05 Jul 2025
+#
+#
+########################################################################################################################
+__author__      = "George Leonard"
+__email__       = "georgelza@gmail.com"
+__version__     = "0.0.1"
+__copyright__   = "Copyright 2025, George Leonard"
+
+
+import sqlite3
+
+from db_base import DatabaseBackend, KEYED_TABLES, MANIFEST_COLUMNS, ROW_HASH_COLUMN, keyed_row_values, keyed_table_ddl
+
+
+# Database file used when no --db-name is given
+SQLITE_DEFAULT_FILE = "snmp_oid_metadata.db"
+
+# Host parameters per statement, below SQLITE_MAX_VARIABLE_NUMBER of older (pre 3.32) builds
+SQLITE_MAX_PARAMS   = 500
+
+
+class SQLiteBackend(DatabaseBackend):
+
+    db_type     = 'sqlite'
+    max_writers = 1             # One writer at a time, also in WAL mode, a second one only waits on the lock
+
+    def connect(self):
+        """Opens (creating if need be) the SQLite database file and the tables the load uses."""
+        try:
+            # The corpus writer uses the connection from a worker thread, never from two at a time
+            self.connection = sqlite3.connect(self.dbname or SQLITE_DEFAULT_FILE, check_same_thread=False)
+            self.cursor     = self.connection.cursor()
+
+            # WAL: readers are not blocked while a load runs, and a commit is an append to the log
+            self.cursor.execute("PRAGMA journal_mode=WAL")
+            self.cursor.execute("PRAGMA synchronous=NORMAL")
+
+            self.cursor.execute(f"""
+                CREATE TABLE IF NOT EXISTS {self.tbl_name} (
+                     oid_string         VARCHAR(255) PRIMARY KEY
+                    ,object_name        VARCHAR(255)
+                    ,data_type          VARCHAR(50)
+                    ,info               VARCHAR(2000)
+                    ,oid_type           VARCHAR(255)
+                    ,mib_module         VARCHAR(50)
+                );
+            """)
+
+            if self.changed_only:
+                self.cursor.execute(f"PRAGMA table_info({self.tbl_name})")
+                if ROW_HASH_COLUMN not in [row[1] for row in self.cursor.fetchall()]:
+                    self.cursor.execute(f"ALTER TABLE {self.tbl_name} ADD COLUMN {ROW_HASH_COLUMN} CHAR(40)")
+
+                # end if
+                self.cursor.execute(f"CREATE INDEX IF NOT EXISTS {self.tbl_name}_mib_module ON {self.tbl_name} (mib_module)")
+
+            # end if
+
+            if self.manifest_name:
+                self.cursor.execute(f"""
+                    CREATE TABLE IF NOT EXISTS {self.manifest_name} (
+                         mib_module         VARCHAR(255) PRIMARY KEY
+                        ,source_hash        CHAR(64)     NOT NULL
+                        ,parser_version     VARCHAR(32)  NOT NULL
+                        ,row_count          INTEGER      NOT NULL
+                        ,loaded_at          TIMESTAMP    NOT NULL
+                    );
+                """)
+
+            # end if
+
+            for kind, table in self.keyed_tables.items():
+                self.cursor.execute(keyed_table_ddl(kind, table))
+
+            # end for
+            self.connection.commit()
+            self.logger.info(f"Connected to SQLite database: {self.dbname or SQLITE_DEFAULT_FILE} (sqlite {sqlite3.sqlite_version})")
+
+        except Exception as e:
+            self.logger.error(f"Error connecting to {self.db_type} database: {e}")
+            self.connection = None
+            self.cursor     = None
+            raise
+
+        # end try
+    # end def
+
+
+    def read_hashes(self, batch):
+        """Stored row hashes of the records in batch, {oid_string: row_hash}."""
+
+        oid_strings = [oid['oid_string'] for oid in batch]
+        stored      = {}
+        try:
+            for i in range(0, len(oid_strings), SQLITE_MAX_PARAMS):
+                chunk = oid_strings[i:i + SQLITE_MAX_PARAMS]
+                self.cursor.execute(f"SELECT oid_string, {ROW_HASH_COLUMN} FROM {self.tbl_name} WHERE oid_string IN ({', '.join(['?'] * len(chunk))})",
+                                    chunk)
+                stored.update(self.cursor.fetchall())
+
+            # end for
+            return stored
+
+        except Exception as e:
+            self.logger.warning(f"Could not read stored row hashes from SQLite, writing the whole batch: {e}")
+            return {}
+
+        # end try
+    # end def
+
+
+    def delete(self, mib_module, keep):
+        """Delete the rows of mib_module whose OID is not in keep, returns the number deleted."""
+
+        try:
+            self.cursor.execute(f"SELECT oid_string FROM {self.tbl_name} WHERE mib_module = ?", (mib_module,))
+            stale = [row[0] for row in self.cursor.fetchall() if row[0] not in keep]
+            with self.connection:
+                self.cursor.executemany(f"DELETE FROM {self.tbl_name} WHERE mib_module = ? AND oid_string = ?", [(mib_module, oid_string) for oid_string in stale])
+
+            # end with
+            return len(stale)
+
+        except Exception as e:
+            self.logger.error(f"Error deleting removed {mib_module} OIDs from SQLite table '{self.tbl_name}': {e}")
+            return 0
+
+        # end try
+    # end def
+
+
+    def load_manifest(self):
+
+        if not self.connection or not self.manifest_name:
+            return {}
+
+        # end if
+
+        try:
+            self.cursor.execute(f"SELECT {', '.join(MANIFEST_COLUMNS)} FROM {self.manifest_name}")
+            return {row[0]: dict(zip(MANIFEST_COLUMNS[1:], row[1:])) for row in self.cursor.fetchall()}
+
+        except Exception as e:
+            self.logger.warning(f"Could not read load manifest '{self.manifest_name}', loading everything: {e}")
+            return {}
+
+        # end try
+    # end def
+
+
+    def update_manifest(self, mib_module, source_hash, parser_version, row_count):
+
+        if not self.connection or not self.manifest_name:
+            return
+
+        # end if
+
+        try:
+            with self.connection:
+                self.cursor.execute(f"""
+                    INSERT INTO {self.manifest_name} (mib_module, source_hash, parser_version, row_count, loaded_at)
+                    VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+                    ON CONFLICT (mib_module) DO UPDATE SET
+                         source_hash        = excluded.source_hash
+                        ,parser_version     = excluded.parser_version
+                        ,row_count          = excluded.row_count
+                        ,loaded_at          = excluded.loaded_at;
+                """, (mib_module, source_hash, parser_version, row_count))
+
+            # end with
+            self.logger.info(f"Load manifest updated for {mib_module}: {row_count} OIDs, source hash {source_hash[:12]}")
+
+        except Exception as e:
+            self.logger.error(f"Error updating load manifest '{self.manifest_name}' for {mib_module}: {e}")
+
+        # end try
+    # end def
+
+
+    def keyed_rows_empty(self, kind):
+
+        table = self.keyed_tables.get(kind)
+        if not self.connection or not table:
+            return False
+
+        # end if
+
+        try:
+            self.cursor.execute(f"SELECT 1 FROM {table} LIMIT 1")
+            return self.cursor.fetchone() is None
+
+        except Exception as e:
+            self.logger.warning(f"Could not read '{table}': {e}")
+            return True
+
+        # end try
+    # end def
+
+
+    def store_keyed_rows(self, kind, rows, prune_module=None):
+        """Replace the rows of prune_module and upsert rows, one transaction."""
+
+        table   = self.keyed_tables[kind]
+        columns = KEYED_TABLES[kind][0]
+        updates = "\n                ,".join(f"{col:<18} = excluded.{col}" for col in columns[1:])
+        sql     = f"""
+            INSERT INTO {table} ({", ".join(columns)})
+            VALUES ({", ".join(["?"] * len(columns))})
+            ON CONFLICT (oid_string) DO UPDATE SET
+                 {updates};
+        """
+
+        try:
+            with self.connection:
+                if prune_module:
+                    self.cursor.execute(f"DELETE FROM {table} WHERE mib_module = ?", (prune_module,))
+
+                # end if
+                self.cursor.executemany(sql, [keyed_row_values(kind, row) for row in rows])
+
+            # end with
+            return True
+
+        except Exception as e:
+            self.logger.error(f"Error writing {kind.replace('_', ' ')} into SQLite table '{table}': {e}")
+            return False
+
+        # end try
+    # end def
+
+
+    def bulk_upsert(self, batch):
+        """Write one batch with a single executemany of INSERT ... ON CONFLICT DO UPDATE, in one transaction."""
+
+        columns = ", ".join(self.columns)
+        updates = "\n                ,".join(f"{col:<18} = excluded.{col}" for col in self.columns[1:])
+        sql     = f"""
+            INSERT INTO {self.tbl_name} ({columns})
+            VALUES ({", ".join(["?"] * len(self.columns))})
+            ON CONFLICT (oid_string) DO UPDATE SET
+                 {updates};
+        """
+
+        try:
+            with self.connection:           # Commits on success, rolls the whole batch back on error
+                self.cursor.executemany(sql, [self._row(oid) for oid in batch])
+
+            # end with
+            self.logger.debug(f"Successfully inserted/updated {len(batch)} OIDs into SQLite table '{self.tbl_name}'.")
+            return True
+
+        except Exception as e:
+            self.logger.error(f"Error inserting into SQLite table '{self.tbl_name}': {e}")
+            return False
+
+        # end try
+    # end def
+# end class
@@ -0,0 +1,393 @@
+#######################################################################################################################
+#
+#
+#  	Project     	: 	SNMP MIB Parser
+#
+#   File            :   mib_cache.py
+#
+#   Description     :   Content addressed cache for the pysmi compile output.
+#
+#                   :   Every module compiled into <mibdir>/compiled_mibs gets a small json entry in
+#                   :   <mibdir>/compiled_mibs/.cache/ holding the hash of the MIB source text it was compiled from
+#                   :   (salted with the pysmi/pysnmp versions) and the set of modules that were pulled in with it.
+#                   :   As long as the source of the module and of everything in that set is unchanged the
+#                   :   compiled .py is reused and MibCompiler.compile is not called at all.
+#
+#                   :   PrecompiledMibs covers the modules that ship already compiled (pysnmp_mibs/): when the
+#                   :   LAST-UPDATED revision of the source matches the one recorded in the compiled module, that
+#                   :   module is loaded as is and pysmi is not run for it. The same holds for every module it imports
+#                   :   that ships precompiled, checked against that module's source in the MIB directories.
+#
+#	By              :   George Leonard ( georgelza@gmail.com )
+#
+#   Created     	:   11 Jul 2025
+#
+#
+########################################################################################################################
+__author__      = "George Leonard"
+__email__       = "georgelza@gmail.com"
+__version__     = "0.0.1"
+__copyright__   = "Copyright 2025, George Leonard"
+
+
+from pysmi.reader       import FileReader
+from pysmi.searcher.base import AbstractSearcher
+from pysmi              import error as smi_error
+
+import pysmi, pysnmp
+import hashlib, json, os, re, tempfile
+
+
+CACHE_SUBDIR    = '.cache'
+CACHE_SALT      = f"pysmi={pysmi.__version__};pysnmp={pysnmp.__version__};".encode('utf-8')
+
+# The modules pysnmp itself bundles (SNMPv2-SMI, SNMPv2-TC, ...), always on a MibBuilder's search path
+PYSNMP_MIBS_DIR = os.path.join(os.path.dirname(pysnmp.__file__), 'smi', 'mibs')
+
+# pysmi generated modules record the MODULE-IDENTITY revision as  <name>.setLastUpdated('200502040000Z')
+LAST_UPDATED_RE = re.compile(rb"""\.setLastUpdated\(\s*['"]([0-9]+Z)['"]\s*\)""")
+
+
+def source_key(text):
+    """Cache key of a MIB source text, changes when the text or the pysmi/pysnmp versions change."""
+
+    if isinstance(text, bytes):
+        text = text.decode('utf-8', 'ignore')     # Same decoding pysmi applies when reading the source
+
+    #end if
+    return hashlib.sha256(CACHE_SALT + text.encode('utf-8')).hexdigest()
+
+#end def
+
+
+class RecordingFileReader(FileReader):
+    """
+    pysmi FileReader that remembers which file it served for each module and the key of the text it handed
+    to the compiler, this is what gets recorded in the cache once the compile succeeded.
+    """
+
+    def __init__(self, path, served, **kwargs):
+        super().__init__(path, **kwargs)
+        self._served = served
+
+    #end def
+
+    def getData(self, mibname, **options):
+        mibInfo, data = super().getData(mibname, **options)
+
+        path = mibInfo.path[len('file://'):] if mibInfo.path.startswith('file://') else mibInfo.path
+        self._served[mibname] = {"path": path, "key": source_key(data)}
+
+        return mibInfo, data
+
+    #end def
+#end class
+
+
+class CacheSearcher(AbstractSearcher):
+    """
+    pysmi searcher backed by the CompileCache, tells the compiler a dependency does not need code generation
+    when its cached compiled module is still valid, so only dirty modules are regenerated.
+    """
+
+    def __init__(self, cache):
+        self._cache = cache
+
+    #end def
+
+    def __str__(self):
+        return f'{self.__class__.__name__}{{"{self._cache.output_dir}"}}'
+
+    #end def
+
+    def fileExists(self, mibname, mtime, rebuild=False):
+        if not rebuild and self._cache.is_valid(mibname):
+            raise smi_error.PySmiFileNotModifiedError()
+
+        #end if
+        raise smi_error.PySmiFileNotFoundError(f"no valid cached {mibname}", searcher=self)
+
+    #end def
+#end class
+
+
+class CompileCache:
+    """
+    Persistent cache of compiled MIB modules, keyed by the hash of the MIB source text plus pysmi/pysnmp versions.
+    """
+
+    def __init__(self, output_dir, log):
+
+        self.output_dir = output_dir
+        self.cache_dir  = os.path.join(output_dir, CACHE_SUBDIR)
+        self.logger     = log
+        self._entries   = {}            # module name -> cache entry, memoised for this process
+        self._current   = {}            # source path -> (mtime, size, key) as seen during this process
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    #end def
+
+
+    def _entry_path(self, module_name):
+        return os.path.join(self.cache_dir, f"{module_name}.json")
+
+    #end def
+
+
+    def _load_entry(self, module_name):
+        if module_name not in self._entries:
+            try:
+                with open(self._entry_path(module_name), 'r') as f:
+                    self._entries[module_name] = json.load(f)
+
+            except (OSError, ValueError):
+                self._entries[module_name] = None
+
+            #end try
+        #end if
+        return self._entries[module_name]
+
+    #end def
+
+
+    def _source_unchanged(self, entry):
+        """
+        Check a recorded source against the file on disk, only re-hashing when mtime/size moved. An entry written
+        under other pysmi/pysnmp versions (CACHE_SALT) is stale whatever its source.
+        """
+
+        if entry.get('salt') != CACHE_SALT.decode('utf-8'):
+            return False
+
+        #end if
+        path = entry['path']
+        try:
+            st = os.stat(path)
+
+        except OSError:
+            return False
+
+        #end try
+
+        if st.st_mtime == entry.get('mtime') and st.st_size == entry.get('size'):
+            return True
+
+        #end if
+
+        if path not in self._current or self._current[path][:2] != (st.st_mtime, st.st_size):
+            with open(path, 'rb') as f:
+                self._current[path] = (st.st_mtime, st.st_size, source_key(f.read()))
+
+            #end with
+        #end if
+        return self._current[path][2] == entry['key']
+
+    #end def
+
+
+    def is_valid(self, module_name):
+        """True if the compiled module and its whole recorded dependency closure are unchanged."""
+
+        entry = self._load_entry(module_name)
+        if not entry or not os.path.exists(os.path.join(self.output_dir, f"{module_name}.py")):
+            return False
+
+        #end if
+
+        if not self._source_unchanged(entry):
+            return False
+
+        #end if
+
+        for dep_name in entry.get('closure', []):
+            dep = self._load_entry(dep_name)
+            if not dep or not self._source_unchanged(dep):
+                return False
+
+            #end if
+        #end for
+        return True
+
+    #end def
+
+
+    def store(self, results, served, root_module):
+        """
+        Record the outcome of a MibCompiler.compile call. Every module pysmi compiled (or left untouched) from
+        a source we served gets an entry whose closure is the set of modules served in that compile, minus the
+        module the compile was requested for (nothing imports the root, so its changes do not dirty the rest).
+        """
+
+        closure = sorted(name for name in served if results.get(name) in ('compiled', 'untouched'))
+
+        for module_name in closure:
+            if results[module_name] == 'untouched' and self.is_valid(module_name):
+                continue            # Entry already up to date
+
+            #end if
+
+            source  = served[module_name]
+            try:
+                st = os.stat(source['path'])
+
+            except OSError:
+                continue
+
+            #end try
+
+            entry = {"salt":      CACHE_SALT.decode('utf-8'),
+                     "key":       source['key'],
+                     "path":      source['path'],
+                     "mtime":     st.st_mtime,
+                     "size":      st.st_size,
+                     "closure":   [name for name in closure if name not in (module_name, root_module)]
+                    }
+
+            # Write via temp file + rename, corpus workers may store the same module concurrently
+            fd, tmp_file = tempfile.mkstemp(dir=self.cache_dir)
+            with os.fdopen(fd, 'w') as f:
+                json.dump(entry, f)
+
+            #end with
+            os.replace(tmp_file, self._entry_path(module_name))
+            self._entries[module_name] = entry
+
+        #end for
+        self.logger.debug(f"Compile cache updated for: {', '.join(closure)}")
+
+    #end def
+#end class
+
+
+class PrecompiledMibs:
+    """
+    Directories of already compiled pysnmp MIB modules (e.g. pysnmp_mibs/). find() tells whether a MIB source can
+    be served by one of them instead of being compiled: same module name, same LAST-UPDATED revision, and every
+    module it imports available precompiled too (so the builder can load it without anything we would compile).
+    Given the sources (a MibIndex over the MIB directories), the modules it imports, directly or through other
+    imports, that are served from these directories must be at the revision of their source as well. Modules of
+    pysnmp's own MIB directory are loaded by the builder either way and are not version checked.
+    """
+
+    def __init__(self, compiled_dirs, log):
+
+        self.compiled_dirs  = [d for d in compiled_dirs if os.path.isdir(d)]
+        self.logger         = log
+        self._revisions     = {}        # compiled module path -> LAST-UPDATED, memoised for this process
+
+    #end def
+
+
+    def _path(self, module_name, dirs=None):
+        """Path of the compiled module_name in the first directory holding it, or None."""
+
+        for compiled_dir in dirs or self.compiled_dirs:
+            path = os.path.join(compiled_dir, f"{module_name}.py")
+            if os.path.isfile(path):
+                return path
+
+            #end if
+        #end for
+        return None
+
+    #end def
+
+
+    def revision(self, path):
+        """LAST-UPDATED recorded in a compiled module, None if it has none (SMIv1) or can not be read."""
+
+        if path not in self._revisions:
+            try:
+                with open(path, 'rb') as f:
+                    match = LAST_UPDATED_RE.search(f.read())
+
+                #end with
+                self._revisions[path] = match.group(1).decode('ascii') if match else None
+
+            except OSError:
+                self._revisions[path] = None
+
+            #end try
+        #end if
+        return self._revisions[path]
+
+    #end def
+
+
+    def find(self, module_name, last_updated, imported, builtin=(), sources=None):
+        """
+        Directory of a precompiled module_name at revision last_updated whose imports are all available precompiled
+        (or are one of the builtin pseudo modules), and with sources, at the revision of their source, else None.
+        """
+
+        if not last_updated:
+            return None             # Without a revision there is nothing to tell two versions of a module apart
+
+        #end if
+
+        path = self._path(module_name)
+        if path is None:
+            return None
+
+        #end if
+
+        revision = self.revision(path)
+        if revision != last_updated:
+            self.logger.info(f"Precompiled {module_name} is at revision {revision}, source is at {last_updated}, compiling")
+            return None
+
+        #end if
+
+        dep_dirs = self.compiled_dirs + [PYSNMP_MIBS_DIR]
+        missing  = [dep for dep in imported if dep not in builtin and self._path(dep, dep_dirs) is None]
+        if missing:
+            self.logger.info(f"Precompiled {module_name} imports modules that are not precompiled: {', '.join(missing)}, compiling")
+            return None
+
+        #end if
+
+        stale = self._stale_imports(imported, builtin, sources) if sources is not None else []
+        if stale:
+            self.logger.info(f"Precompiled {module_name} imports modules older than their source: {', '.join(stale)}, compiling")
+            return None
+
+        #end if
+        return os.path.dirname(path)
+
+    #end def
+
+
+    def _stale_imports(self, imported, builtin, sources):
+        """
+        The modules of the import closure of imported served from compiled_dirs at another revision than their
+        source in sources (a MibIndex), as "module (precompiled revision != source revision)".
+        """
+
+        stale   = []
+        pending = list(imported)
+        seen    = set(builtin)
+        while pending:
+            dep = pending.pop()
+            if dep in seen:
+                continue
+
+            #end if
+            seen.add(dep)
+            path = self._path(dep)
+            if path is None:
+                continue            # Not one of ours, pysnmp's own MIB directory serves it
+
+            #end if
+            source_revision = sources.last_updated(dep)
+            if source_revision and self.revision(path) != source_revision:
+                stale.append(f"{dep} ({self.revision(path)} != {source_revision})")
+
+            #end if
+            pending.extend(sources.imports(dep) or ())
+
+        #end while
+        return stale
+
+    #end def
+#end class
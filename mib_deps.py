@@ -0,0 +1,266 @@
+#######################################################################################################################
+#
+#
+#  	Project     	: 	SNMP MIB Parser
+#
+#   File            :   mib_deps.py
+#
+#   Description     :   IMPORTS dependency graph over the indexed MIB modules.
+#
+#                   :   Starting from a set of root modules the graph follows every IMPORTS clause (read through the
+#                   :   MibIndex) and reports, before anything is compiled, which imported modules can not be found
+#                   :   and which modules import each other in a cycle. plan() orders the buildable modules in
+#                   :   layers: every module only depends on modules of earlier layers, so all modules of one layer
+#                   :   can be compiled in parallel once the previous layers are done.
+#
+#	By              :   George Leonard ( georgelza@gmail.com )
+#
+#   Created     	:   11 Jul 2025
+#
+#
+########################################################################################################################
+__author__      = "George Leonard"
+__email__       = "georgelza@gmail.com"
+__version__     = "0.0.1"
+__copyright__   = "Copyright 2025, George Leonard"
+
+
+from pysmi.codegen.pysnmp   import PySnmpCodeGen
+
+
+# Pseudo modules pysmi provides itself, they never have a source file
+BUILTIN_MODULES = frozenset(PySnmpCodeGen.fakeMibs)
+
+
+class MibDependencyGraph:
+    """
+    IMPORTS graph of root modules and everything they (transitively) import, built from a MibIndex.
+
+        imports     {module: [imported modules that are indexed]}
+        missing     {module: [imported modules that are not]}
+    """
+
+    def __init__(self, index, roots, log):
+
+        self.index      = index
+        self.logger     = log
+        self.imports    = {}
+        self.missing    = {}
+
+        pending = [module for module in roots if module not in BUILTIN_MODULES]
+        while pending:
+            module = pending.pop()
+            if module in self.imports or module in self.missing:
+                continue
+
+            #end if
+
+            imported = index.imports(module)
+            if imported is None:
+                self.missing[module] = []               # A root that is not indexed itself
+                continue
+
+            #end if
+
+            self.imports[module] = []
+            for dep in imported:
+                if dep in BUILTIN_MODULES or dep == module:
+                    continue
+
+                #end if
+                if index.lookup(dep) is None:
+                    self.missing.setdefault(module, []).append(dep)
+
+                else:
+                    self.imports[module].append(dep)
+                    pending.append(dep)
+
+                #end if
+            #end for
+        #end while
+
+        index.flush()
+        self._components = self._strongly_connected()
+
+    #end def
+
+
+    def _strongly_connected(self):
+        """
+        Tarjan's algorithm (iterative), returns the strongly connected components in dependency order, i.e. a
+        component is only listed after every component it imports from.
+        """
+
+        counter     = 0
+        order       = {}
+        low         = {}
+        stack       = []
+        on_stack    = set()
+        components  = []
+
+        for start in sorted(self.imports):
+            if start in order:
+                continue
+
+            #end if
+
+            work = [(start, iter(self.imports[start]))]
+            order[start] = low[start] = counter
+            counter += 1
+            stack.append(start)
+            on_stack.add(start)
+
+            while work:
+                node, deps = work[-1]
+                advanced   = False
+                for dep in deps:
+                    if dep not in order:
+                        order[dep] = low[dep] = counter
+                        counter += 1
+                        stack.append(dep)
+                        on_stack.add(dep)
+                        work.append((dep, iter(self.imports[dep])))
+                        advanced = True
+                        break
+
+                    elif dep in on_stack:
+                        low[node] = min(low[node], order[dep])
+
+                    #end if
+                #end for
+                if advanced:
+                    continue
+
+                #end if
+
+                work.pop()
+                if work:
+                    parent      = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+
+                #end if
+
+                if low[node] == order[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+
+                        #end if
+                    #end while
+                    components.append(sorted(component))
+
+                #end if
+            #end while
+        #end for
+        return components
+
+    #end def
+
+
+    def cycles(self):
+        """Groups of modules that import each other (directly or through one another)."""
+
+        return [component for component in self._components if len(component) > 1]
+
+    #end def
+
+
+    def blocked(self):
+        """
+        {module: missing modules} for every module that can not be compiled because it, or something it
+        imports, imports a module that is not available.
+        """
+
+        blocked = {module: sorted(set(deps)) for module, deps in self.missing.items() if module in self.imports}
+        for component in self._components:
+            missing = set()
+            for module in component:
+                missing.update(blocked.get(module, []))
+                for dep in self.imports[module]:
+                    missing.update(blocked.get(dep, []))
+
+                #end for
+            #end for
+            if missing:
+                for module in component:
+                    blocked[module] = sorted(missing)
+
+                #end for
+            #end if
+        #end for
+        return blocked
+
+    #end def
+
+
+    def plan(self):
+        """
+        Layers of buildable modules, [[module, ...], ...]. A module only imports modules of earlier layers (or of
+        its own cycle, whose members share a layer), so each layer can be compiled in parallel.
+        """
+
+        blocked = self.blocked()
+        level   = {}
+        layers  = []
+
+        for component in self._components:
+            if component[0] in blocked:
+                continue
+
+            #end if
+
+            depth = 0
+            for module in component:
+                for dep in self.imports[module]:
+                    if dep not in component:
+                        depth = max(depth, level[dep] + 1)
+
+                    #end if
+                #end for
+            #end for
+
+            for module in component:
+                level[module] = depth
+
+            #end for
+            while len(layers) <= depth:
+                layers.append([])
+
+            #end while
+            layers[depth].extend(component)
+
+        #end for
+        return [sorted(layer) for layer in layers]
+
+    #end def
+
+
+    def report(self):
+        """Log the missing modules and cycles found."""
+
+        for module, deps in sorted(self.missing.items()):
+            if module in self.imports:
+                self.logger.warning(f"{module} imports modules that were not found: {', '.join(deps)}")
+
+            else:
+                self.logger.warning(f"{module} not found in the MIB directories")
+
+            #end if
+        #end for
+
+        for component in self.cycles():
+            self.logger.warning(f"Circular IMPORTS between: {', '.join(component)}")
+
+        #end for
+
+        blocked = self.blocked()
+        if blocked:
+            self.logger.warning(f"{len(blocked)} module(s) can not be compiled because of missing imports: {', '.join(sorted(blocked))}")
+
+        #end if
+    #end def
+#end class
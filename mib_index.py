@@ -0,0 +1,376 @@
+#######################################################################################################################
+#
+#
+#  	Project     	: 	SNMP MIB Parser
+#
+#   File            :   mib_index.py
+#
+#   Description     :   Persistent module name -> file index over the MIB search directories.
+#
+#                   :   pysmi's FileReader finds an imported module by listing every search directory (recursively)
+#                   :   and probing a dozen file name variants per directory, for every single import. Vendor
+#                   :   directories name their files anything (.my, no extension, 10892.mib, ...), so the probing
+#                   :   often misses too. MibIndex reads the DEFINITIONS header of every file once, keeps the result
+#                   :   in <compiled_mibs>/.cache/module_index.json and only re-reads directories/files whose mtime
+#                   :   moved. IndexedFileReader serves pysmi from that index with a single dict lookup.
+#
+#	By              :   George Leonard ( georgelza@gmail.com )
+#
+#   Created     	:   11 Jul 2025
+#
+#
+########################################################################################################################
+__author__      = "George Leonard"
+__email__       = "georgelza@gmail.com"
+__version__     = "0.0.1"
+__copyright__   = "Copyright 2025, George Leonard"
+
+
+from mib_cache          import CACHE_SUBDIR, source_key
+from mib_source         import MibSource
+
+from pysmi.reader.base  import AbstractReader
+from pysmi.mibinfo      import MibInfo
+from pysmi.compat       import decode
+from pysmi              import error as smi_error
+
+import json, os, tempfile
+
+
+INDEX_FILE          = "module_index.json"
+
+# Files that are never MIB sources, not worth opening
+NON_MIB_EXTENSIONS  = ('.py', '.pyc', '.md', '.json', '.log', '.sql', '.sh', '.zip', '.gz', '.png', '.jpg', '.pdf')
+
+# (search directories, output directory) -> MibIndex, one per process, see shared_index()
+_shared_indexes     = {}
+
+
+class MibIndex:
+    """
+    Module name -> MIB file path over a list of search directories (each searched recursively, in order, the
+    first file defining a module wins). Persisted per directory as {dir: {'mtime', 'files': {path: [mtime, size, module]}}},
+    a file entry gets the module's IMPORTS appended the first time they are asked for.
+    """
+
+    def __init__(self, mib_dirs, output_dir, log):
+
+        cache_dir       = os.path.join(output_dir, CACHE_SUBDIR)
+        self.mib_dirs   = [os.path.normpath(os.path.abspath(d)) for d in mib_dirs]
+        self.index_file = os.path.join(cache_dir, INDEX_FILE)
+        self.logger     = log
+        self._dirs      = {}            # directory -> {'mtime': ..., 'files': {path: [mtime, size, module]}}
+        self._modules   = {}            # module name -> path, across all mib_dirs
+        self._entries   = {}            # module name -> its file entry in _dirs
+        self._revisions = {}            # module name -> LAST-UPDATED of its source, memoised for this process
+        self._walked    = []            # directories visited by the last refresh, in search order
+        self._dirty     = False
+
+        os.makedirs(cache_dir, exist_ok=True)
+        self._load()
+        self.refresh()
+
+    #end def
+
+
+    def _load(self):
+        try:
+            with open(self.index_file, 'r') as f:
+                self._dirs = json.load(f)
+
+        except (OSError, ValueError):
+            self._dirs = {}
+
+        #end try
+    #end def
+
+
+    def _save(self):
+        # Write via temp file + rename, corpus workers may refresh the same index concurrently
+        fd, tmp_file = tempfile.mkstemp(dir=os.path.dirname(self.index_file))
+        with os.fdopen(fd, 'w') as f:
+            json.dump(self._dirs, f)
+
+        #end with
+        os.replace(tmp_file, self.index_file)
+        self._dirty = False
+
+    #end def
+
+
+    def _scan_dir(self, directory, mtime):
+        """(Re)index the files directly in directory, only reading the header of new or modified files."""
+
+        known   = self._dirs.get(directory, {}).get('files', {})
+        files   = {}
+        subdirs = []
+
+        try:
+            entries = sorted(os.scandir(directory), key=lambda e: e.name)
+
+        except OSError as e:
+            self.logger.warning(f"MIB index could not list {directory}: {e}")
+            entries = []
+
+        #end try
+
+        for entry in entries:
+            if entry.name.startswith('.'):
+                continue
+
+            #end if
+            if entry.is_dir():
+                if entry.name != 'compiled_mibs':
+                    subdirs.append(entry.path)
+
+                #end if
+                continue
+
+            #end if
+            if not entry.is_file() or entry.name.lower().endswith(NON_MIB_EXTENSIONS):
+                continue
+
+            #end if
+
+            st      = entry.stat()
+            cached  = known.get(entry.path)
+            if cached and cached[0] == st.st_mtime and cached[1] == st.st_size:       # Unchanged, keeps its IMPORTS too
+                files[entry.path] = cached
+                continue
+
+            #end if
+
+            with MibSource(entry.path, self.logger) as mib_source:
+                module = mib_source.module_name if mib_source.has_definitions else None
+
+            #end with
+            files[entry.path] = [st.st_mtime, st.st_size, module]
+
+        #end for
+
+        self._dirs[directory]   = {'mtime': mtime, 'files': files, 'subdirs': subdirs}
+        self._dirty             = True
+
+    #end def
+
+
+    def refresh(self, check_files=True):
+        """
+        Bring the index up to date, re-scanning only directories whose mtime changed. check_files also stats
+        every file of an unchanged directory (see _files_moved), off for the cheap per MIB refresh of shared_index.
+        """
+
+        walked          = []
+        scanned         = 0
+
+        for mib_dir in self.mib_dirs:
+            pending = [mib_dir]
+            while pending:
+                directory = pending.pop(0)
+                try:
+                    mtime = os.stat(directory).st_mtime
+
+                except OSError:
+                    continue
+
+                #end try
+
+                entry = self._dirs.get(directory)
+                if not entry or entry.get('mtime') != mtime or (check_files and self._files_moved(entry)):
+                    self._scan_dir(directory, mtime)
+                    scanned += 1
+
+                #end if
+                walked.append(directory)
+                pending.extend(self._dirs[directory].get('subdirs', []))
+
+            #end while
+        #end for
+
+        # Module name -> path only needs rebuilding when a directory was (re)scanned or came / went
+        if scanned or walked != self._walked:
+            self._modules   = {}
+            self._entries   = {}
+            self._revisions = {}
+            for directory in walked:
+                for path, file_entry in self._dirs[directory]['files'].items():
+                    module = file_entry[2]
+                    if module and module not in self._modules:
+                        self._modules[module] = path
+                        self._entries[module] = file_entry
+
+                    #end if
+                #end for
+            #end for
+            self._walked = walked
+
+        #end if
+
+        if self._dirty:
+            self._save()
+            self.logger.debug(f"MIB index refreshed, {scanned} director(y/ies) re-scanned, {len(self._modules)} modules")
+
+        #end if
+    #end def
+
+
+    def flush(self):
+        """Persist entries added since the last save (e.g. IMPORTS read by imports())."""
+
+        if self._dirty:
+            self._save()
+
+        #end if
+    #end def
+
+
+    def _files_moved(self, entry):
+        """An in place edit does not change the directory mtime, check the files of a clean directory too."""
+
+        for path, file_entry in entry['files'].items():
+            try:
+                st = os.stat(path)
+
+            except OSError:
+                return True
+
+            #end try
+            if st.st_mtime != file_entry[0] or st.st_size != file_entry[1]:
+                return True
+
+            #end if
+        #end for
+        return False
+
+    #end def
+
+
+    def lookup(self, module_name):
+        """Path of the file defining module_name, or None."""
+
+        return self._modules.get(module_name)
+
+    #end def
+
+
+    def imports(self, module_name):
+        """
+        Names of the modules module_name imports from, read from its IMPORTS clause the first time and kept in
+        the index from then on. None if module_name is not indexed.
+        """
+
+        file_entry = self._entries.get(module_name)
+        if file_entry is None:
+            return None
+
+        #end if
+
+        if len(file_entry) < 4:
+            with MibSource(self._modules[module_name], self.logger) as mib_source:
+                file_entry.append(mib_source.imported_modules)
+
+            #end with
+            self._dirty = True
+
+        #end if
+        return file_entry[3]
+
+    #end def
+
+
+    def last_updated(self, module_name):
+        """LAST-UPDATED of the source defining module_name, None if it has none (SMIv1) or is not indexed."""
+
+        if module_name not in self._revisions:
+            path = self._modules.get(module_name)
+            if path is None:
+                self._revisions[module_name] = None
+
+            else:
+                with MibSource(path, self.logger) as mib_source:
+                    self._revisions[module_name] = mib_source.last_updated
+
+                #end with
+            #end if
+        #end if
+        return self._revisions[module_name]
+
+    #end def
+
+
+    def modules(self):
+        """All indexed module names."""
+
+        return self._modules.keys()
+
+    #end def
+
+
+    def __len__(self):
+        return len(self._modules)
+
+    #end def
+#end class
+
+
+def shared_index(mib_dirs, output_dir, log):
+    """
+    MibIndex over mib_dirs kept for the life of the process, so compiling one MIB after the other (or a corpus
+    worker compiling its share) does not re-load the index and stat every file per MIB. Built (with the full
+    file check) on first use, after that only directories whose mtime moved are re-scanned.
+    """
+
+    key     = (tuple(os.path.normpath(os.path.abspath(d)) for d in mib_dirs), os.path.abspath(output_dir))
+    index   = _shared_indexes.get(key)
+    if index is None:
+        index = _shared_indexes[key] = MibIndex(mib_dirs, output_dir, log)
+
+    else:
+        index.refresh(check_files=False)
+
+    #end if
+    return index
+
+#end def
+
+
+class IndexedFileReader(AbstractReader):
+    """
+    pysmi reader serving MIB sources from a MibIndex, one dict lookup per module instead of probing file name
+    variants in every directory. Like RecordingFileReader it notes what it served in served for the compile cache.
+    """
+
+    def __init__(self, index, served=None):
+        self._index     = index
+        self._served    = served if served is not None else {}
+
+    #end def
+
+    def __str__(self):
+        return f'{self.__class__.__name__}{{"{self._index.index_file}"}}'
+
+    #end def
+
+    def getData(self, mibname, **options):
+        path = self._index.lookup(mibname)
+        if path is None:
+            raise smi_error.PySmiReaderFileNotFoundError(f"source MIB {mibname} not in MIB index", reader=self)
+
+        #end if
+
+        try:
+            mtime = os.stat(path).st_mtime
+            with open(path, 'rb') as f:
+                data = decode(f.read(self.maxMibSize))
+
+            #end with
+        except OSError as e:
+            raise smi_error.PySmiReaderFileNotFoundError(f"source MIB {mibname} at {path} not readable: {e}", reader=self)
+
+        #end try
+
+        self._served[mibname] = {"path": path, "key": source_key(data)}
+        return MibInfo(path=f"file://{path}", file=os.path.basename(path), name=mibname, mtime=mtime), data
+
+    #end def
+#end class
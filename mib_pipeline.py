@@ -0,0 +1,160 @@
+#######################################################################################################################
+#
+#
+#  	Project     	: 	SNMP MIB Parser
+#
+#   File            :   mib_pipeline.py
+#
+#   Description     :   Overlap the CPU bound compile/walk work with the database writes.
+#
+#                   :   corpus_pipeline() is an asyncio pipeline: every MIB is compiled + walked in the process pool,
+#                   :   completed results go through a bounded queue to a set of writer tasks, each owning its own
+#                   :   database connection. The writers run the (blocking) backend in a thread, the drivers release
+#                   :   the GIL while they wait on the server, so the pool, the event loop and up to `writers` writes
+#                   :   all make progress at the same time.
+#
+#                   :   prefetch() does the same for a single MIB: the walk runs ahead in a thread while the batch
+#                   :   before it is being written.
+#
+#	By              :   George Leonard ( georgelza@gmail.com )
+#
+#   Created     	:   11 Jul 2025
+#
+#
+########################################################################################################################
+__author__      = "George Leonard"
+__email__       = "georgelza@gmail.com"
+__version__     = "0.0.1"
+__copyright__   = "Copyright 2025, George Leonard"
+
+
+import asyncio, queue, threading
+
+
+_DONE = object()        # End of stream marker
+
+
+def prefetch(iterable, chunk_size=1000, depth=2):
+    """
+    Yield the items of iterable while a background thread produces the next ones, at most depth chunks of
+    chunk_size items ahead. An exception raised by the producer is re-raised in the consumer.
+    """
+
+    chunks = queue.Queue(maxsize=max(1, depth))
+    stop   = threading.Event()
+
+    def produce():
+        chunk = []
+        try:
+            for item in iterable:
+                chunk.append(item)
+                if len(chunk) >= chunk_size:
+                    chunks.put(chunk)
+                    chunk = []
+                    if stop.is_set():
+                        return
+
+                    #end if
+                #end if
+            #end for
+            if chunk:
+                chunks.put(chunk)
+
+            #end if
+            chunks.put(_DONE)
+
+        except BaseException as e:
+            chunks.put(e)
+
+        #end try
+    #end def
+
+    producer = threading.Thread(target=produce, name="prefetch", daemon=True)
+    producer.start()
+    try:
+        while True:
+            chunk = chunks.get()
+            if chunk is _DONE:
+                break
+
+            #end if
+            if isinstance(chunk, BaseException):
+                raise chunk
+
+            #end if
+            yield from chunk
+
+        #end while
+    finally:
+        # Consumer stopped early, let the producer finish its current chunk and exit
+        stop.set()
+        while producer.is_alive():
+            try:
+                chunks.get_nowait()
+
+            except queue.Empty:
+                producer.join(0.05)
+
+            #end try
+        #end while
+    #end try
+#end def
+
+
+async def corpus_pipeline(pool, worker, jobs, backends, load, max_inflight, log, workers=1):
+    """
+    Run worker(*args) in pool for every args tuple in jobs and hand each result to load(backend, result), called in
+    a thread with one of backends. Every backend is used by a single writer task, so there are at most
+    len(backends) writes in flight, and at most max_inflight completed results waiting for a writer.
+    A job is only submitted to the pool (of workers processes) while fewer than workers + max_inflight jobs are
+    running or waiting for a writer, so the pool runs ahead of the writers by a bounded window and the memory
+    held by results does not grow with the number of jobs.
+    """
+
+    loop    = asyncio.get_running_loop()
+    results = asyncio.Queue(maxsize=max(1, max_inflight))
+    window  = asyncio.Semaphore(max(1, workers) + max(1, max_inflight))
+
+    async def produce(args):
+        await window.acquire()          # Released once a writer takes the result
+        try:
+            result = await loop.run_in_executor(pool, worker, *args)
+
+        except Exception as e:
+            window.release()
+            log.error(f"Worker failed: {e}")
+            return
+
+        #end try
+        await results.put(result)
+
+    #end def
+
+    async def write(backend):
+        while True:
+            result = await results.get()
+            if result is _DONE:
+                return
+
+            #end if
+            window.release()
+            try:
+                await asyncio.to_thread(load, backend, result)
+
+            except Exception as e:
+                log.error(f"Writer failed: {e}")
+
+            #end try
+        #end while
+    #end def
+
+    writers = [asyncio.create_task(write(backend)) for backend in backends]
+
+    await asyncio.gather(*(produce(args) for args in jobs))
+    for _ in writers:
+        await results.put(_DONE)
+
+    #end for
+    await asyncio.gather(*writers)
+
+#end def
@@ -0,0 +1,214 @@
+#######################################################################################################################
+#
+#
+#  	Project     	: 	SNMP MIB Parser
+#
+#   File            :   mib_snapshot.py
+#
+#   Description     :   Warm start for the base MIB modules every MibBuilder loads before the target MIB.
+#
+#                   :   SNMPv2-SMI, SNMPv2-TC, SNMPv2-MIB and RFC1213-MIB (plus the ASN1 and SNMPv2-CONF modules they
+#                   :   pull in) always come from pysnmp's bundled MIB directory, so their symbols are the same for
+#                   :   every MIB we process. The loaded symbol tables can not be pickled (pysnmp creates their classes
+#                   :   by exec'ing the module source), so the snapshot is kept in two levels:
+#                   :
+#                   :   - on disk, the compiled code objects of the base modules in load order (marshal), which saves
+#                   :     reading and compiling the module sources in every new process.
+#                   :   - in process, the loaded symbol tables themselves; every further MibBuilder of the process
+#                   :     (e.g. a corpus worker) gets a copy of them and does not execute the base modules again.
+#                   :     The table rows are copied per builder, a MIB that AUGMENTS a base row registers itself in
+#                   :     that row (registerAugmentions); every other base symbol is only read once loaded and shared.
+#
+#	By              :   George Leonard ( georgelza@gmail.com )
+#
+#   Created     	:   11 Jul 2025
+#
+#
+########################################################################################################################
+__author__      = "George Leonard"
+__email__       = "georgelza@gmail.com"
+__version__     = "0.0.1"
+__copyright__   = "Copyright 2025, George Leonard"
+
+
+from pysnmp.smi         import builder
+
+import pysnmp
+import copy, importlib.util, marshal, os, tempfile
+
+
+BASE_MODULES    = ('SNMPv2-SMI', 'SNMPv2-TC', 'SNMPv2-MIB', 'RFC1213-MIB')
+SNAPSHOT_FILE   = "base_mibs.snapshot"
+
+# Snapshots are only valid for the Python bytecode and pysnmp version that wrote them
+SNAPSHOT_MAGIC  = importlib.util.MAGIC_NUMBER + f"pysnmp={pysnmp.__version__};".encode('utf-8')
+
+_loaded         = {}            # modules tuple -> (mibSymbols, modSeen) of the base modules, per process
+
+
+class BaseMibSnapshot:
+    """
+    Loads the base MIB modules into a MibBuilder from the process wide copy, the on disk snapshot or, failing both,
+    the regular way (after which the snapshot is written for the next process).
+    """
+
+    def __init__(self, cache_dir, log, modules=BASE_MODULES):
+
+        self.snapshot_file  = os.path.join(cache_dir, SNAPSHOT_FILE)
+        self.modules        = tuple(modules)
+        self.logger         = log
+
+    #end def
+
+
+    @staticmethod
+    def _seen(mibBuilder):
+        # MibBuilder keeps what it loaded in name mangled attributes, load_module() skips any path in modPathsSeen
+        return mibBuilder._MibBuilder__modSeen, mibBuilder._MibBuilder__modPathsSeen
+
+    #end def
+
+
+    def restore(self, mibBuilder):
+        """
+        Add the base modules to mibBuilder (which has not loaded anything yet). The table rows are copied, with their
+        own augmentingRows, as loading a MIB that AUGMENTS one of them adds to it; the other symbol objects are
+        shared with every other builder of this process, they are only read once loaded.
+        """
+
+        if self.modules not in _loaded:
+            _loaded[self.modules] = self._load()
+
+        #end if
+
+        mib_symbols, mod_seen   = _loaded[self.modules]
+        seen, paths_seen        = self._seen(mibBuilder)
+        for module, symbols in mib_symbols.items():
+            mibBuilder.mibSymbols[module] = {name: self._own(symbol) for name, symbol in symbols.items()}
+
+        #end for
+        seen.update(mod_seen)
+        paths_seen.update(mod_seen.values())
+
+    #end def
+
+
+    @staticmethod
+    def _own(symbol):
+        """symbol as a builder gets it: a copy of a table row instance (its augmentingRows too), any other as is."""
+
+        if isinstance(getattr(symbol, 'augmentingRows', None), dict):
+            symbol                  = copy.copy(symbol)
+            symbol.augmentingRows   = dict(symbol.augmentingRows)
+
+        #end if
+        return symbol
+
+    #end def
+
+
+    def _load(self):
+        """Load the base modules into a scratch builder (default MIB sources only), returns its symbols and paths."""
+
+        scratch = builder.MibBuilder()
+        if not self._load_snapshot(scratch):
+            scratch = builder.MibBuilder()
+            scratch.load_modules(*self.modules)
+            self._save_snapshot(scratch)
+
+        #end if
+
+        mod_seen, _ = self._seen(scratch)
+        return {module: dict(symbols) for module, symbols in scratch.mibSymbols.items()}, dict(mod_seen)
+
+    #end def
+
+
+    def _load_snapshot(self, scratch):
+        """Execute the snapshot's code objects into scratch, False if there is no usable snapshot."""
+
+        try:
+            with open(self.snapshot_file, 'rb') as f:
+                if f.read(len(SNAPSHOT_MAGIC)) != SNAPSHOT_MAGIC:
+                    return False
+
+                #end if
+                header, entries = marshal.load(f)
+
+            #end with
+        except (OSError, EOFError, ValueError, TypeError):
+            return False
+
+        #end try
+
+        if header != self.modules:
+            return False
+
+        #end if
+
+        # A changed module source (pysnmp upgrade in place) invalidates the snapshot
+        for module, path, mtime, size, code in entries:
+            try:
+                st = os.stat(path)
+
+            except OSError:
+                return False
+
+            #end try
+            if st.st_mtime != mtime or st.st_size != size:
+                return False
+
+            #end if
+        #end for
+
+        seen, paths_seen = self._seen(scratch)
+        try:
+            for module, path, mtime, size, code in entries:     # Stored in load order, dependencies first
+                exec(code, {"mibBuilder": scratch, "userCtx": {}})
+                seen[module] = path
+                paths_seen.add(path)
+
+            #end for
+        except Exception as e:
+            self.logger.warning(f"Base MIB snapshot {self.snapshot_file} could not be restored: {e}")
+            return False
+
+        #end try
+
+        self.logger.debug(f"Base MIB modules restored from snapshot {self.snapshot_file}")
+        return True
+
+    #end def
+
+
+    def _save_snapshot(self, scratch):
+
+        mod_seen, _ = self._seen(scratch)
+        try:
+            entries = []
+            for module, path in mod_seen.items():                # Insertion order is load completion order
+                st = os.stat(path)
+                with open(path, 'r') as f:
+                    code = compile(f.read(), path, 'exec')
+
+                #end with
+                entries.append((module, path, st.st_mtime, st.st_size, code))
+
+            #end for
+
+            # Write via temp file + rename, corpus workers may write the same snapshot concurrently
+            os.makedirs(os.path.dirname(self.snapshot_file), exist_ok=True)
+            fd, tmp_file = tempfile.mkstemp(dir=os.path.dirname(self.snapshot_file))
+            with os.fdopen(fd, 'wb') as f:
+                f.write(SNAPSHOT_MAGIC)
+                marshal.dump((self.modules, entries), f)
+
+            #end with
+            os.replace(tmp_file, self.snapshot_file)
+
+        except (OSError, SyntaxError, ValueError) as e:
+            self.logger.warning(f"Base MIB snapshot {self.snapshot_file} could not be written: {e}")
+
+        #end try
+    #end def
+#end class
@@ -0,0 +1,341 @@
+#######################################################################################################################
+#
+#
+#  	Project     	: 	SNMP MIB Parser
+#
+#   File            :   mib_source.py
+#
+#   Description     :   Single pass reader for a MIB source file.
+#
+#                   :   The file is read once (memory mapped when it is large) and tokenized once (smi_lexer), the
+#                   :   module name, the OID prefix of the module and the per object DESCRIPTION/SYNTAX metadata are
+#                   :   all derived from that one copy, instead of every caller opening and scanning the file again.
+#
+#	By              :   George Leonard ( georgelza@gmail.com )
+#
+#   Created     	:   11 Jul 2025
+#
+#
+########################################################################################################################
+__author__      = "George Leonard"
+__email__       = "georgelza@gmail.com"
+__version__     = "0.0.1"
+__copyright__   = "Copyright 2025, George Leonard"
+
+
+from smi_lexer          import iter_definitions
+
+import mmap, os
+
+
+MMAP_THRESHOLD  = 256 * 1024        # Files from this size on are memory mapped rather than read
+
+# Roots of the OID tree every module can refer to without defining them
+WELL_KNOWN_OIDS = {
+    'ccitt':            (0,),
+    'iso':              (1,),
+    'joint-iso-ccitt':  (2,),
+    'org':              (1, 3),
+    'dod':              (1, 3, 6),
+    'internet':         (1, 3, 6, 1),
+    'directory':        (1, 3, 6, 1, 1),
+    'mgmt':             (1, 3, 6, 1, 2),
+    'mib-2':            (1, 3, 6, 1, 2, 1),
+    'transmission':     (1, 3, 6, 1, 2, 1, 10),
+    'experimental':     (1, 3, 6, 1, 3),
+    'private':          (1, 3, 6, 1, 4),
+    'enterprises':      (1, 3, 6, 1, 4, 1),
+    'security':         (1, 3, 6, 1, 5),
+    'snmpV2':           (1, 3, 6, 1, 6),
+    'snmpDomains':      (1, 3, 6, 1, 6, 1),
+    'snmpProxys':       (1, 3, 6, 1, 6, 2),
+    'snmpModules':      (1, 3, 6, 1, 6, 3),
+}
+
+
+class MibSource:
+    """
+    A MIB source file, read once and shared by everybody that needs something out of it.
+    The module name is found straight from the raw (possibly mmapped) bytes, the decoded text, its definitions
+    and the parsed metadata are only produced the first time they are asked for.
+    """
+
+    def __init__(self, mib_file_path, log):
+
+        self.path       = mib_file_path
+        self.logger     = log
+        self._raw       = b""
+        self._mmap      = None
+        self._text      = None
+        self._defs      = None
+        self._module    = None
+        self._prefix    = False         # False = not determined yet, None = module has no OID prefix
+        self._metadata  = None
+
+        try:
+            with open(mib_file_path, 'rb') as f:
+                size = os.fstat(f.fileno()).st_size
+                if size >= MMAP_THRESHOLD:
+                    self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                    self._raw  = self._mmap
+
+                else:
+                    self._raw  = f.read()
+
+                #end if
+            #end with
+        except Exception as e:
+            log.error(f"Error reading MIB file {mib_file_path}: {e}")
+
+        #end try
+    #end def
+
+
+    def close(self):
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+            self._raw  = b""
+
+        #end if
+    #end def
+
+
+    def __enter__(self):
+        return self
+
+    #end def
+
+
+    def __exit__(self, *exc):
+        self.close()
+
+    #end def
+
+
+    @property
+    def text(self):
+        """Decoded source text."""
+
+        if self._text is None:
+            self._text = bytes(self._raw).decode('utf-8', 'ignore')
+
+        #end if
+        return self._text
+
+    #end def
+
+
+    @property
+    def has_definitions(self):
+        """True if this looks like a MIB module at all (has a DEFINITIONS header)."""
+
+        return self._find_module_name() is not None
+
+    #end def
+
+
+    def _find_module_name(self):
+        """Module name from the first non comment line holding 'DEFINITIONS', None if there is none."""
+
+        pos = self._raw.find(b'DEFINITIONS')
+        while pos != -1:
+            line_start  = self._raw.rfind(b'\n', 0, pos) + 1
+            line_end    = self._raw.find(b'\n', pos)
+            line        = bytes(self._raw[line_start:line_end if line_end != -1 else len(self._raw)]).strip()
+
+            if not line.startswith(b'--'):
+                return line.split(b'DEFINITIONS')[0].strip().decode('utf-8', 'ignore')
+
+            #end if
+            pos = self._raw.find(b'DEFINITIONS', pos + len(b'DEFINITIONS'))
+
+        #end while
+        return None
+
+    #end def
+
+
+    @property
+    def module_name(self):
+        """The MIB module name, falls back to the filename without extension."""
+
+        if self._module is None:
+            self._module = self._find_module_name() or os.path.splitext(os.path.basename(self.path))[0]
+
+        #end if
+        return self._module
+
+    #end def
+
+
+    @property
+    def definitions(self):
+        """All definition records of the module (see smi_lexer.iter_definitions), tokenized once."""
+
+        if self._defs is None:
+            try:
+                self._defs = list(iter_definitions(self.text))
+
+            except Exception as e:
+                self.logger.error(f"Error tokenizing MIB file {self.path}: {e}")
+                self._defs = []
+
+            #end try
+        #end if
+        return self._defs
+
+    #end def
+
+
+    @property
+    def last_updated(self):
+        """LAST-UPDATED of the MODULE-IDENTITY (e.g. '200502040000Z'), None for modules without one (SMIv1)."""
+
+        for record in self.definitions:
+            if record['macro'] == 'MODULE-IDENTITY':
+                values = record['clauses'].get('LAST-UPDATED', [[]])[0]
+                return values[0] if values else None
+
+            #end if
+        #end for
+        return None
+
+    #end def
+
+
+    @property
+    def imported_modules(self):
+        """Names of the modules listed in the IMPORTS clause."""
+
+        imported = set()
+        for record in self.definitions:
+            if record['macro'] == 'IMPORTS':
+                imported.update(record['imports'])
+
+            #end if
+        #end for
+        return sorted(imported)
+
+    #end def
+
+
+    @property
+    def oid_prefix(self):
+        """The OID prefix of the module (the OID its MODULE-IDENTITY is registered at), or None."""
+
+        if self._prefix is False:
+            try:
+                self._prefix = self._find_oid_prefix()
+
+            except Exception as e:
+                self.logger.error(f"Error extracting OID prefix from {self.path}: {e}")
+                self._prefix = None
+
+            #end try
+        #end if
+        return self._prefix
+
+    #end def
+
+
+    def _find_oid_prefix(self):
+
+        assignments = {}
+        identity    = None
+        for record in self.definitions:
+            if record['name'] and record['value']:
+                assignments[record['name']] = record['value']
+
+            #end if
+            if identity is None and record['macro'] == 'MODULE-IDENTITY':
+                identity = record['name']
+
+            #end if
+        #end for
+
+        if identity is None:
+            return None
+
+        #end if
+
+        oid = resolve_oid(identity, assignments)
+        return '.'.join(str(x) for x in oid) if oid else None
+
+    #end def
+
+
+    @property
+    def metadata(self):
+        """Per object {'info': DESCRIPTION, 'type': SYNTAX} for the OBJECT-TYPE definitions."""
+
+        if self._metadata is None:
+            metadata = {}
+            for record in self.definitions:
+                if record['macro'] == 'OBJECT-TYPE':
+                    metadata[record['name']] = {
+                        'info': (record['description'] or "").strip(),
+                        'type': record['syntax'] or ""
+                    }
+
+                #end if
+            #end for
+
+            self._metadata = metadata
+            self.logger.info(f"Extracted metadata for {len(metadata)} objects from MIB file")
+
+        #end if
+        return self._metadata
+
+    #end def
+#end class
+
+
+def resolve_oid(name, assignments, _depth=0):
+    """
+    Resolve a symbolic OID to a tuple of integers using the module's own OID assignments
+    (name -> value tokens, e.g. ['enterprises', '50536']) on top of the well known SMI roots.
+    Returns None if it refers to something defined elsewhere.
+    """
+
+    if name in WELL_KNOWN_OIDS:
+        return WELL_KNOWN_OIDS[name]
+
+    #end if
+
+    value = assignments.get(name)
+    if not value or _depth > 64:
+        return None
+
+    #end if
+
+    oid = ()
+    i   = 0
+    while i < len(value):
+        token = value[i]
+
+        if token.isdigit():
+            oid += (int(token),)
+
+        elif i + 3 < len(value) and value[i + 1] == '(' and value[i + 2].isdigit():
+            oid += (int(value[i + 2]),)                  # iso(1) / org(3) style
+            i   += 3
+
+        elif i == 0:
+            parent = resolve_oid(token, assignments, _depth + 1)
+            if parent is None:
+                return None
+
+            #end if
+            oid = parent
+
+        else:
+            return None
+
+        #end if
+        i += 1
+
+    #end while
+    return oid
+
+#end def
@@ -0,0 +1,133 @@
+#######################################################################################################################
+#
+#
+#  	Project     	: 	SNMP MIB Parser
+#
+#   File            :   mib_tables.py
+#
+#   Description     :   INDEX / AUGMENTS structure of a conceptual row (table entry): the objects indexing it, in
+#                   :   order, and for each how its value is encoded in the instance OID suffix (RFC 2578 7.7), so
+#                   :   a column instance such as ifInOctets.17 or tcpConnState.10.0.0.1.22.10.0.0.2.51234 can be
+#                   :   split into typed index values without the MIB (see oid_resolver.decode_index).
+#
+#                   :   mib_parser.py --table-indexes writes one row per table entry to a table (SQL) or hash
+#                   :   (Redis) next to the OID metadata, see db_base.TABLE_INDEX_COLUMNS.
+#
+#   Encodings       :   integer         one arc
+#                   :   ipaddress       four arcs
+#                   :   networkaddress  SMIv1 NetworkAddress, a tag arc (1 = internet) then four arcs
+#                   :   fixed           length arcs, a fixed size OCTET STRING
+#                   :   implied         every remaining arc, the last index object declared IMPLIED
+#                   :   length          a length arc, then that many arcs (OCTET STRING, BITS, OBJECT IDENTIFIER)
+#
+#	By              :   George Leonard ( georgelza@gmail.com )
+#
+#   Created     	:   11 Jul 2025
+#
+#
+########################################################################################################################
+__author__      = "George Leonard"
+__email__       = "georgelza@gmail.com"
+__version__     = "0.0.1"
+__copyright__   = "Copyright 2025, George Leonard"
+
+
+from pyasn1.type import univ
+from pysnmp.proto import rfc1902
+
+from mib_values import base_type
+
+
+_INTEGER_TAG    = univ.Integer.tagSet.getBaseTag()
+_OCTETS_TAG     = univ.OctetString.tagSet.getBaseTag()
+_OID_TAG        = univ.ObjectIdentifier.tagSet.getBaseTag()
+
+
+def _encoding(syntax, implied):
+    """(encoding, length, format) of an index object's syntax, in the order pysnmp's MibTableRow decodes them."""
+
+    tag_set = syntax.getTagSet()
+    if isinstance(syntax, univ.Choice):                 # SMIv1 NetworkAddress, the only CHOICE an index can be
+        return "networkaddress", 5, "ip"
+
+    elif tag_set.getBaseTag() == _INTEGER_TAG:
+        return "integer", 1, "int"
+
+    elif rfc1902.IpAddress.tagSet.isSuperTagSetOf(tag_set):
+        return "ipaddress", 4, "ip"
+
+    elif tag_set.getBaseTag() == _OID_TAG:
+        return ("implied", None, "oid") if implied else ("length", None, "oid")
+
+    elif tag_set.getBaseTag() == _OCTETS_TAG:
+        # A DISPLAY-HINT ending in a (ascii) or t (utf-8) renders the octets as text, e.g. 255a of DisplayString
+        hint    = str(getattr(syntax, 'displayHint', None) or "")
+        fmt     = "text" if hint[-1:] in ('a', 't') else "octets"
+        if implied:
+            return "implied", None, fmt
+
+        elif syntax.is_fixed_length():
+            return "fixed", syntax.get_fixed_length(), fmt
+
+        #end if
+        return "length", None, fmt
+
+    #end if
+    raise ValueError(f"Unknown index syntax {type(syntax).__name__}")
+
+#end def
+
+
+def index_object(mibBuilder, implied, mod_name, sym_name):
+    """Description of one INDEX object (an entry of MibTableRow.getIndexNames()), a dict as in TABLE_INDEX_COLUMNS."""
+
+    node,                       = mibBuilder.import_symbols(mod_name, sym_name)
+    encoding, length, fmt       = _encoding(node.syntax, implied)
+    return { "name":        sym_name
+            ,"module":      mod_name
+            ,"oid":         '.'.join(str(arc) for arc in node.name)
+            ,"base_type":   base_type(node.syntax)
+            ,"encoding":    encoding
+            ,"length":      length
+            ,"implied":     bool(implied)
+            ,"format":      fmt
+           }
+
+#end def
+
+
+def table_index(mibBuilder, mibView, mibNode, oid_string, mib_module, object_name):
+    """
+    Table index row of a conceptual row node, a dict over db_base.TABLE_INDEX_COLUMNS: index_objects (see
+    index_object) and augments, the oid_string of the row it AUGMENTS (None for a row with its own INDEX).
+    None when mibNode is no row or declares no index.
+    """
+
+    index_names = mibNode.getIndexNames() if hasattr(mibNode, 'getIndexNames') else ()
+    if not index_names:
+        return None
+
+    #end if
+    index_objects = [index_object(mibBuilder, *index_name) for index_name in index_names]
+
+    # An AUGMENTS row takes over the INDEX of its base row, the row the first index object is a column of, which
+    # lists the augmenting rows it registered
+    augments        = None
+    base_oid        = tuple(int(arc) for arc in index_objects[0]['oid'].split('.'))[:-1]
+    if '.'.join(str(arc) for arc in base_oid) != oid_string:
+        base_module, base_name, suffix  = mibView.get_node_location(base_oid)
+        base_row,                       = mibBuilder.import_symbols(base_module, base_name)
+        if not suffix and (mib_module, object_name) in getattr(base_row, 'augmentingRows', {}):
+            augments = '.'.join(str(arc) for arc in base_oid)
+
+        #end if
+    #end if
+
+    return { "oid_string":     oid_string
+            ,"mib_module":     mib_module
+            ,"object_name":    object_name
+            ,"augments":       augments
+            ,"index_objects":  index_objects
+           }
+
+#end def
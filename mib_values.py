@@ -0,0 +1,156 @@
+#######################################################################################################################
+#
+#
+#  	Project     	: 	SNMP MIB Parser
+#
+#   File            :   mib_values.py
+#
+#   Description     :   Value decoding data of a MIB object's SYNTAX: its enumeration (namedValues, also the bit
+#                   :   names of BITS), the DISPLAY-HINT of its textual convention and the value ranges / sizes it
+#                   :   is restricted to, so a stream can decode a polled value with one lookup by OID.
+#
+#                   :   mib_parser.py --value-maps writes one row per scalar / column that carries any of them to a
+#                   :   table (SQL) or hash (Redis) next to the OID metadata, see db_base.VALUE_MAP_COLUMNS.
+#
+#	By              :   George Leonard ( georgelza@gmail.com )
+#
+#   Created     	:   11 Jul 2025
+#
+#
+########################################################################################################################
+__author__      = "George Leonard"
+__email__       = "georgelza@gmail.com"
+__version__     = "0.0.1"
+__copyright__   = "Copyright 2025, George Leonard"
+
+
+from pyasn1.type import constraint
+
+
+def _merge(intervals):
+    """Sorted, non overlapping union of (low, high) intervals, adjacent integer intervals joined."""
+
+    merged = []
+    for low, high in sorted(intervals):
+        if merged and low <= merged[-1][1] + 1:
+            merged[-1][1] = max(merged[-1][1], high)
+
+        else:
+            merged.append([low, high])
+
+        #end if
+    #end for
+    return merged
+
+#end def
+
+
+def _intersect(left, right):
+    """Intersection of two merged interval lists, None stands for unrestricted."""
+
+    if left is None or right is None:
+        return right if left is None else left
+
+    #end if
+    return [[max(a[0], b[0]), min(a[1], b[1])] for a in left for b in right if max(a[0], b[0]) <= min(a[1], b[1])]
+
+#end def
+
+
+def _intervals(spec, kind):
+    """
+    Intervals a constraint (set) allows, for kind ValueRangeConstraint (values) or ValueSizeConstraint (sizes).
+    None when it does not restrict that kind.
+    """
+
+    if isinstance(spec, constraint.ConstraintsIntersection):
+        allowed = None
+        for member in spec:
+            allowed = _intersect(allowed, _intervals(member, kind))
+
+        #end for
+        return allowed
+
+    elif isinstance(spec, constraint.ConstraintsUnion):
+        members = [_intervals(member, kind) for member in spec]
+        if not members or None in members:
+            return None
+
+        #end if
+        return _merge(interval for member in members for interval in member)
+
+    elif type(spec) is kind:        # ValueSizeConstraint is a ValueRangeConstraint subclass
+        return _merge([(spec.start, spec.stop)])
+
+    elif kind is constraint.ValueRangeConstraint and isinstance(spec, constraint.SingleValueConstraint):
+        return _merge((value, value) for value in spec)
+
+    #end if
+    return None                 # Any other constraint does not limit the values or sizes
+
+#end def
+
+
+def _declared(spec, kind):
+    """
+    Intervals of kind the SYNTAX declares, None when it does not narrow what its base type allows already (the
+    first constraint of the intersection is the base type's own, e.g. 0..4294967295 of a Counter32).
+    """
+
+    if not isinstance(spec, constraint.ConstraintsIntersection) or not len(spec):
+        return None
+
+    #end if
+    allowed = _intervals(spec, kind)
+    return allowed if allowed != _intervals(spec[0], kind) else None
+
+#end def
+
+
+def base_type(syntax):
+    """Name of the SMI type under a syntax's textual conventions, e.g. Integer32 for an enumerated TC."""
+
+    # SNMPv2-TC is exec'ed by the MIB builder, not importable, its TextualConvention is known by name only
+    mro         = type(syntax).__mro__
+    conventions = [cls for cls in mro if cls.__name__ == 'TextualConvention']
+    return next((cls.__name__ for cls in mro if not any(issubclass(cls, tc) for tc in conventions)), type(syntax).__name__)
+
+#end def
+
+
+def value_map(oid_string, mib_module, syntax):
+    """
+    Value map row of an object, a dict over db_base.VALUE_MAP_COLUMNS: base_type, display_hint, enums
+    ({value: name}), ranges and sizes ([[low, high], ...]). None when its syntax has nothing to decode.
+    """
+
+    if syntax is None:
+        return None
+
+    #end if
+    named   = getattr(syntax, 'namedValues', None)
+    enums   = {int(value): str(name) for name, value in named.items()} if named else None
+    hint    = getattr(syntax, 'displayHint', None) or None
+    spec    = getattr(syntax, 'subtypeSpec', None)
+    ranges  = _declared(spec, constraint.ValueRangeConstraint)
+    sizes   = _declared(spec, constraint.ValueSizeConstraint)
+
+    # An enumeration's ranges are its values
+    if enums:
+        ranges = None
+
+    #end if
+    if not (enums or hint or ranges or sizes):
+        return None
+
+    #end if
+    return { "oid_string":   oid_string
+            ,"mib_module":   mib_module
+            ,"base_type":    base_type(syntax)
+            ,"display_hint": hint
+            ,"enums":        dict(sorted(enums.items())) if enums else None
+            ,"ranges":       ranges
+            ,"sizes":        sizes
+           }
+
+#end def
@@ -0,0 +1,428 @@
+#######################################################################################################################
+#
+#
+#  	Project     	: 	SNMP MIB Parser
+#
+#   File            :   oid_annotate.py
+#
+#   Description     :   Annotate snmpwalk output with the extracted OID metadata: every varbind gets the object it
+#                   :   is an instance of (oid_string, object_name, mib_module, types) and its index suffix.
+#
+#                   :   The input is streamed in batches, each batch's OIDs are turned into a NumPy array of fixed
+#                   :   width keys (the OidIndex key encoding) and resolved against the index's sorted keys with
+#                   :   one searchsorted per OID depth present in the index, longest first, so a batch costs a few
+#                   :   vectorised binary searches instead of a lookup per varbind. Multi-GB (also .gz) walk
+#                   :   archives are processed in constant memory.
+#
+#   Usage           :   python oid_annotate.py \
+#                           --index-file snmp_oids.idx \
+#                           --input walks/dc1.walk.gz \
+#                           --output dc1.parquet \
+#                           --format parquet
+#
+#           --index-file:       OID index written by mib_parser.py --index-file, or
+#           --mib-file:         MIB file to extract the metadata from (instead of --index-file), or
+#           --mib-corpus:       Directory of MIB files to extract the metadata from.
+#           --mib-dirs:         Comma-separated list of directories where dependent MIBs are located (--mib-file/-corpus).
+#           --input:            snmpwalk output (defaults to stdin), .gz files are decompressed on the fly.
+#           --input-format:     walk: net-snmp text with numeric OIDs (snmpwalk -On, or iso.3.6.1...), jsonl: one
+#                               {"oid": ..., "type": ..., "value": ...} object per line. auto (default) picks jsonl for
+#                               .json / .jsonl / .ndjson files.
+#           --output:           Output file (defaults to stdout, not for parquet).
+#           --format:           csv, jsonl or parquet (needs pyarrow), defaults to csv.
+#           --batch-size:       Varbinds resolved per batch (defaults to 100000).
+#           --all-nodes:        Also resolve to table, row and group nodes, not only to scalars and columns.
+#
+#	By              :   George Leonard ( georgelza@gmail.com )
+#
+#   Created     	:   11 Jul 2025
+#
+#
+########################################################################################################################
+__author__      = "George Leonard"
+__email__       = "georgelza@gmail.com"
+__version__     = "0.0.1"
+__copyright__   = "Copyright 2025, George Leonard"
+
+
+from oid_index import OidIndex, ENTRY_INSTANCE, write_oid_index
+from oid_resolver import RESOLVED_COLUMNS, extract_records
+from oid_trie import parse_oid
+
+import argparse, contextlib, csv, gzip, json, os, re, sys, tempfile
+from itertools import islice
+
+import numpy as np
+
+
+# Columns of the annotated output, the object fields are empty when the OID did not resolve
+ANNOTATED_COLUMNS   = ('instance_oid', 'type', 'value') + RESOLVED_COLUMNS[1:]
+
+# A varbind line of snmpwalk: numeric (.1.3.6...), iso.3.6... or MODULE::name OID, " = ", value
+WALK_LINE           = re.compile(r'^\s*(\.?\d[\d.]*|iso(?:\.\d+)*|[A-Za-z][\w-]*::\S+) = ?(.*)$')
+
+# "TYPE: value", e.g. STRING, Counter32, Hex-STRING, Network Address
+WALK_TYPE           = re.compile(r'^([A-Za-z][\w -]*?): (.*)$', re.DOTALL)
+
+_MAX_ARC            = 0xFFFFFFFE
+
+
+def split_value(text):
+    """(type, value) of the right hand side of a varbind line, type is '' when the value carries none."""
+
+    match = WALK_TYPE.match(text)
+    return (match.group(1), match.group(2)) if match else ('', text)
+
+#end def
+
+
+def read_walk(stream):
+    """
+    Generator of [oid, type, value] of net-snmp snmpwalk text. Lines that are no varbind continue the value of the
+    previous one (multi line STRINGs). iso.3.6.1... is turned into 1.3.6.1..., symbolic OIDs are passed as is.
+    """
+
+    current = None
+    for line in stream:
+        line    = line.rstrip('\r\n')
+        match   = WALK_LINE.match(line)
+        if match:
+            if current:
+                yield current
+
+            #end if
+            oid     = match.group(1)
+            oid     = '1' + oid[3:] if oid.startswith('iso') else oid.lstrip('.')
+            current = [oid, *split_value(match.group(2))]
+
+        elif current is not None:
+            current[2] += '\n' + line
+
+        #end if
+    #end for
+    if current:
+        yield current
+
+    #end if
+#end def
+
+
+def read_jsonl(stream):
+    """Generator of [oid, type, value] of JSON lines {"oid": ..., "type": ..., "value": ...}."""
+
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+
+        #end if
+        item    = json.loads(line)
+        value   = item.get('value')
+        yield [str(item.get('oid', '')).strip().lstrip('.'), str(item.get('type') or ''), '' if value is None else str(value)]
+
+    #end for
+#end def
+
+
+class BatchResolver:
+    """
+    Vectorised OidIndex.resolve: the keys and flags of the index are loaded into NumPy arrays once, batches of
+    OIDs are then resolved with one searchsorted per key depth the index holds.
+    """
+
+    def __init__(self, index, instances_only=True):
+
+        self.index      = index
+        self.arcs       = index.arcs
+        self._records   = {}            # position -> record, the objects seen so far
+        self.keys       = np.zeros(0, dtype=f'S{max(1, 4 * self.arcs)}')
+        self.usable     = np.zeros(0, dtype=bool)
+        self.depths     = []
+
+        if len(index) and self.arcs:
+            # A copy of the keys, contiguous for searchsorted, the mmap is not pinned by the arrays
+            view    = index.entry_view()
+            entries = np.frombuffer(view, dtype=np.dtype({'names':    ['key', 'flags'],
+                                                          'formats':  [f'S{4 * self.arcs}', '>u4'],
+                                                          'offsets':  [0, 4 * self.arcs],
+                                                          'itemsize': index.entry_size}))
+            self.keys   = entries['key'].copy()
+            flags       = entries['flags'].astype(np.uint32)
+            del entries
+            view.release()
+
+            self.usable = (flags & ENTRY_INSTANCE) != 0 if instances_only else np.ones(len(flags), dtype=bool)
+            depths      = (self.keys.view('>u4').reshape(len(self.keys), self.arcs) != 0).sum(axis=1)
+            self.depths = sorted(set(depths[self.usable].tolist()), reverse=True)
+
+        #end if
+    #end def
+
+
+    def encode(self, oids):
+        """(n x arcs array of arc + 1, zero padded, number of arcs usable per OID) of a list of dotted OIDs."""
+
+        n       = len(oids)
+        counts  = np.fromiter((oid.count('.') + 1 if oid else 0 for oid in oids), dtype=np.int64, count=n)
+        try:
+            flat = np.array('.'.join(oid for oid in oids if oid).split('.'), dtype=np.int64) if counts.any() else np.zeros(0, dtype=np.int64)
+
+        except (ValueError, OverflowError):
+            # Something in the batch is no numeric OID, parse one by one and leave those out
+            parsed = []
+            for i, oid in enumerate(oids):
+                try:
+                    arcs = parse_oid(oid)
+
+                except ValueError:
+                    arcs = ()
+
+                #end try
+                counts[i] = len(arcs)
+                parsed.extend(min(arc, _MAX_ARC + 1) for arc in arcs)     # Too large either way, and fits an int64
+
+            #end for
+            flat = np.array(parsed, dtype=np.int64)
+
+        #end try
+
+        rows    = np.repeat(np.arange(n), counts)
+        cols    = np.arange(len(flat)) - np.repeat(np.cumsum(counts) - counts, counts)
+        depth   = np.minimum(counts, self.arcs)
+
+        # No stored OID goes beyond an arc the index can not hold
+        bad     = (flat < 0) | (flat > _MAX_ARC)
+        np.minimum.at(depth, rows[bad], cols[bad])
+
+        keep    = cols < depth[rows]
+        encoded = np.zeros((n, max(1, self.arcs)), dtype='>u4')
+        encoded[rows[keep], cols[keep]] = flat[keep] + 1
+        return encoded, depth
+
+    #end def
+
+
+    def resolve(self, oids):
+        """(index position, matched depth) per OID of the list, position -1 where it does not resolve."""
+
+        n               = len(oids)
+        position        = np.full(n, -1, dtype=np.int64)
+        matched         = np.zeros(n, dtype=np.int64)
+        encoded, depth  = self.encode(oids)
+        last            = len(self.keys) - 1
+
+        for d in self.depths:
+            pending = np.nonzero((position < 0) & (depth >= d))[0]
+            if not len(pending):
+                continue
+
+            #end if
+            prefix          = encoded[pending]
+            prefix[:, d:]   = 0
+            keys            = prefix.view(self.keys.dtype).ravel()
+            found           = np.minimum(np.searchsorted(self.keys, keys), last)
+            hit             = (self.keys[found] == keys) & self.usable[found]
+            position[pending[hit]] = found[hit]
+            matched[pending[hit]]  = d
+
+        #end for
+        return position, matched
+
+    #end def
+
+
+    def annotate(self, varbinds):
+        """Rows over ANNOTATED_COLUMNS for a batch of [oid, type, value], and the number that resolved."""
+
+        position, matched   = self.resolve([varbind[0] for varbind in varbinds])
+        rows                = []
+        for (oid, value_type, value), p, d in zip(varbinds, position.tolist(), matched.tolist()):
+            if p < 0:
+                rows.append([oid, value_type, value] + [None] * (len(RESOLVED_COLUMNS) - 1))
+                continue
+
+            #end if
+            record = self._records.get(p)
+            if record is None:
+                record = self._records[p] = self.index.record(p)
+
+            #end if
+            rows.append([oid, value_type, value] + [record.get(column) for column in RESOLVED_COLUMNS[1:-1]] + ['.'.join(oid.split('.')[d:])])
+
+        #end for
+        return rows, int((position >= 0).sum())
+
+    #end def
+#end class
+
+
+class AnnotationWriter:
+    """Writes batches of annotated rows as csv, jsonl or parquet."""
+
+    def __init__(self, stream, output_format, path=None):
+
+        self.output_format  = output_format
+        self.stream         = stream
+        if output_format == 'csv':
+            self._csv = csv.writer(stream)
+            self._csv.writerow(ANNOTATED_COLUMNS)
+
+        elif output_format == 'parquet':
+            try:
+                import pyarrow, pyarrow.parquet
+
+            except ImportError as e:
+                raise ImportError(f"pyarrow is not installed. Cannot write parquet: {e}")
+
+            #end try
+            self._pa        = pyarrow
+            self._schema    = pyarrow.schema([(column, pyarrow.string()) for column in ANNOTATED_COLUMNS])
+            self._parquet   = pyarrow.parquet.ParquetWriter(path, self._schema)
+
+        #end if
+    #end def
+
+
+    def write(self, rows):
+
+        if self.output_format == 'csv':
+            self._csv.writerows(rows)
+
+        elif self.output_format == 'jsonl':
+            self.stream.writelines(json.dumps(dict(zip(ANNOTATED_COLUMNS, row))) + "\n" for row in rows)
+
+        else:
+            columns = list(zip(*rows)) if rows else [()] * len(ANNOTATED_COLUMNS)
+            self._parquet.write_table(self._pa.table([list(column) for column in columns], schema=self._schema))
+
+        #end if
+    #end def
+
+
+    def close(self):
+
+        if self.output_format == 'parquet':
+            self._parquet.close()
+
+        #end if
+    #end def
+#end class
+
+
+def open_text(path):
+    """Text stream of path, '-' for stdin, gzip'ed when the name ends in .gz."""
+
+    if path == '-':
+        return contextlib.nullcontext(sys.stdin)
+
+    #end if
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8', errors='replace')
+
+    #end if
+    return open(path, 'r', encoding='utf-8', errors='replace')
+
+#end def
+
+
+def parse_arguments():
+
+    import mib_parser
+
+    parser = argparse.ArgumentParser(description="Annotate snmpwalk output with the OID metadata extracted from the MIBs.")
+
+    metadata_group = parser.add_mutually_exclusive_group(required=True)
+    metadata_group.add_argument('--index-file',     help='OID index written by mib_parser.py --index-file')
+    metadata_group.add_argument('--mib-file',       help='MIB file the metadata is extracted from')
+    metadata_group.add_argument('--mib-corpus',     help='Directory of MIB files the metadata is extracted from')
+    parser.add_argument('--mib-dirs',               help='Comma-separated list of MIB directories containing dependencies (with --mib-file/--mib-corpus)')
+    parser.add_argument('--no-compile-cache',       dest='compile_cache', action='store_false', help='Recompile MIBs with pysmi even if the compile cache holds an up to date copy.')
+    parser.add_argument('--exclude-prefixes',       default=','.join(mib_parser.DEFAULT_EXCLUDED_PREFIXES), help='Comma-separated OID prefixes, as given to mib_parser.py for the load.')
+    parser.add_argument('--input',                  default='-', help='snmpwalk output, .gz is decompressed. Defaults to stdin.')
+    parser.add_argument('--input-format',           choices=['auto', 'walk', 'jsonl'], default='auto', help='walk (net-snmp text, numeric OIDs) or jsonl. Defaults to auto, by file name.')
+    parser.add_argument('--output',                 default='-', help='Output file. Defaults to stdout.')
+    parser.add_argument('--format',                 choices=['csv', 'jsonl', 'parquet'], default='csv', help='Output format, parquet needs pyarrow. Defaults to csv.')
+    parser.add_argument('--batch-size',             type=int, default=100000, help='Varbinds resolved per batch. Defaults to 100000.')
+    parser.add_argument('--all-nodes',              dest='instances_only', action='store_false', help='Also resolve to table, row and group nodes, not only to scalars and columns.')
+
+    args = parser.parse_args()
+    if not args.index_file and not args.mib_dirs:
+        parser.error("--mib-dirs is required with --mib-file / --mib-corpus")
+
+    #end if
+    if args.format == 'parquet' and args.output == '-':
+        parser.error("parquet needs an --output file")
+
+    #end if
+    if args.input_format == 'auto':
+        name                = args.input[:-3] if args.input.endswith('.gz') else args.input
+        args.input_format   = 'jsonl' if name.endswith(('.json', '.jsonl', '.ndjson')) else 'walk'
+
+    #end if
+    return args
+
+#end def
+
+
+def main():
+
+    import mib_parser
+    from utils import logger
+
+    args = parse_arguments()
+    log  = logger(filename           = f"oid_annotate_{mib_parser.datetime_str}.log",
+                  console_debuglevel = 2,     # WARNING, the console may be carrying the output
+                  file_debuglevel    = mib_parser.FILE_DEBUG_LEVEL,
+                  console_format     = mib_parser.CONSOLE_LOG_FORMAT,
+                  file_format        = mib_parser.FILE_LOG_FORMAT
+            )
+
+    with contextlib.ExitStack() as stack:
+        index_file = args.index_file
+        if not index_file:
+            # Extracted metadata goes through a temporary index, the resolution is the same either way
+            index_file = os.path.join(stack.enter_context(tempfile.TemporaryDirectory()), "oids.idx")
+            write_oid_index(index_file, extract_records(args, log), log)
+
+        #end if
+
+        index       = stack.enter_context(OidIndex(index_file))
+        resolver    = BatchResolver(index, args.instances_only)
+        source      = stack.enter_context(open_text(args.input))
+        if args.format == 'parquet':
+            target  = None          # pyarrow writes the file itself
+
+        else:
+            target  = sys.stdout if args.output == '-' else stack.enter_context(open(args.output, 'w', encoding='utf-8', newline=''))
+
+        #end if
+        writer      = AnnotationWriter(target, args.format, args.output)
+        varbinds    = read_jsonl(source) if args.input_format == 'jsonl' else read_walk(source)
+
+        total = resolved = 0
+        try:
+            while True:
+                batch = list(islice(varbinds, max(1, args.batch_size)))
+                if not batch:
+                    break
+
+                #end if
+                rows, hits  = resolver.annotate(batch)
+                writer.write(rows)
+                total      += len(batch)
+                resolved   += hits
+                log.info(f"{total} varbinds annotated, {resolved} resolved")
+
+            #end while
+        finally:
+            writer.close()
+
+        #end try
+    #end with
+    log.info(f"Done: {total} varbinds, {resolved} resolved, {total - resolved} unresolved")
+
+#end def
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,321 @@
+#######################################################################################################################
+#
+#
+#  	Project     	: 	SNMP MIB Parser
+#
+#   File            :   oid_index.py
+#
+#   Description     :   Memory mapped binary OID index, lookups without a database round trip (mib_parser.py
+#                   :   --index-file writes it next to the database load).
+#
+#                   :   The file is opened with mmap and binary searched in place, nothing is deserialised up front,
+#                   :   so opening is O(1) and any number of processes share the same page cache copy.
+#
+#   Layout          :   All integers big-endian.
+#
+#                       header      magic "OIDX", version u16, key arcs u16, entry count u32,
+#                                   entries offset u64, string table offset u64
+#                       entries     count fixed width entries, sorted by key:
+#                                       key         key arcs x u32, every arc stored as arc + 1, zero padded, so a
+#                                                   plain byte compare orders the keys as OIDs (a prefix sorts before
+#                                                   the OIDs under it)
+#                                       flags       u32, ENTRY_INSTANCE when the object is a scalar or column
+#                                       fields      (offset u32, length u32) into the string table for each of
+#                                                   INDEX_FIELDS
+#                       strings     UTF-8, every distinct string stored once
+#
+#	By              :   George Leonard ( georgelza@gmail.com )
+#
+#   Created     	:   11 Jul 2025
+#
+#
+########################################################################################################################
+__author__      = "George Leonard"
+__email__       = "georgelza@gmail.com"
+__version__     = "0.0.1"
+__copyright__   = "Copyright 2025, George Leonard"
+
+
+import mmap, os, struct
+
+from oid_resolver import NON_INSTANCE_TYPES
+from oid_trie import parse_oid
+
+
+INDEX_MAGIC     = b"OIDX"
+INDEX_VERSION   = 1
+INDEX_HEADER    = struct.Struct(">4sHHIQQ")
+
+# Record fields held in the string table, oid_string is the key itself
+INDEX_FIELDS    = ('object_name', 'info', 'data_type', 'oid_type', 'mib_module')
+
+ENTRY_INSTANCE  = 0x1           # Scalar or column, an instance OID can resolve to it
+
+_MAX_ARC        = 0xFFFFFFFE    # arc + 1 has to fit a u32
+
+
+def encode_key(oid, arcs):
+    """Fixed width key of oid (a tuple of ints) for an index of arcs wide keys, None if it does not fit."""
+
+    if len(oid) > arcs or (oid and (min(oid) < 0 or max(oid) > _MAX_ARC)):
+        return None
+
+    #end if
+    return struct.pack(f">{arcs}I", *(arc + 1 for arc in oid), *([0] * (arcs - len(oid))))
+
+#end def
+
+
+def write_oid_index(path, records, log):
+    """
+    Write the OID records (dicts as extracted by mib_parser) to an index file at path, replacing it atomically.
+    A later record for the same oid_string replaces an earlier one. Returns the number of entries written.
+    """
+
+    entries = {}
+    for record in records:
+        oid = parse_oid(record['oid_string'])
+        if any(arc > _MAX_ARC for arc in oid):
+            log.warning(f"OID {record['oid_string']} has an arc too large for the index, skipped")
+            continue
+
+        #end if
+        entries[oid] = record
+
+    #end for
+
+    arcs        = max((len(oid) for oid in entries), default=0)
+    entry       = struct.Struct(f">{arcs * 4}sI{'II' * len(INDEX_FIELDS)}")
+    strings     = bytearray()
+    interned    = {}
+
+    def intern(value):
+        data = str(value if value is not None else "").encode('utf-8')
+        if data not in interned:
+            interned[data] = len(strings)
+            strings.extend(data)
+
+        #end if
+        return interned[data], len(data)
+
+    #end def
+
+    body = bytearray()
+    for oid in sorted(entries, key=lambda oid: encode_key(oid, arcs)):
+        record  = entries[oid]
+        flags   = 0 if record.get('data_type', '') in NON_INSTANCE_TYPES else ENTRY_INSTANCE
+        fields  = [part for field in INDEX_FIELDS for part in intern(record.get(field))]
+        body.extend(entry.pack(encode_key(oid, arcs), flags, *fields))
+
+    #end for
+
+    header  = INDEX_HEADER.pack(INDEX_MAGIC, INDEX_VERSION, arcs, len(entries), INDEX_HEADER.size, INDEX_HEADER.size + len(body))
+    tmp     = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'wb') as f:
+        f.write(header)
+        f.write(body)
+        f.write(strings)
+
+    #end with
+    os.replace(tmp, path)
+
+    log.info(f"OID index {path} written: {len(entries)} entries, {arcs} arc keys, {len(strings)} bytes of strings")
+    return len(entries)
+
+#end def
+
+
+class OidIndex:
+    """
+    Read side of an index file, mmap'ed and binary searched in place. Use as a context manager or close() it.
+    """
+
+    def __init__(self, path):
+
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        #end with
+
+        magic, version, self.arcs, self._count, self._entries, self._strings = INDEX_HEADER.unpack_from(self._mm, 0)
+        if magic != INDEX_MAGIC or version != INDEX_VERSION:
+            self._mm.close()
+            raise ValueError(f"{path} is not a version {INDEX_VERSION} OID index file")
+
+        #end if
+        self._key_size  = self.arcs * 4
+        self._pads      = [bytes(4 * (self.arcs - depth)) for depth in range(self.arcs + 1)]
+        self._entry     = struct.Struct(f">{self._key_size}sI{'II' * len(INDEX_FIELDS)}")
+        self._fields    = struct.Struct(f">I{'II' * len(INDEX_FIELDS)}")
+
+    #end def
+
+
+    def __len__(self):
+        return self._count
+
+    #end def
+
+
+    def __enter__(self):
+        return self
+
+    #end def
+
+
+    def __exit__(self, *exc):
+        self.close()
+
+    #end def
+
+
+    def close(self):
+        self._mm.close()
+
+    #end def
+
+
+    def _find(self, key, hi=None):
+        """
+        Position of the entry with exactly key among the first hi entries. When there is none, -(insertion point) - 1,
+        so any negative value is a miss.
+        """
+
+        lo, hi  = 0, self._count if hi is None else hi
+        size    = self._entry.size
+        while lo < hi:
+            mid     = (lo + hi) // 2
+            start   = self._entries + mid * size
+            probe   = self._mm[start:start + self._key_size]
+            if probe < key:
+                lo = mid + 1
+
+            elif probe > key:
+                hi = mid
+
+            else:
+                return mid
+
+            #end if
+        #end while
+        return -lo - 1
+
+    #end def
+
+
+    def _record(self, position, oid_string=None):
+        """(flags, record dict) of the entry at position, pass the oid_string when it is known already."""
+
+        start           = self._entries + position * self._entry.size
+        flags, *fields  = self._fields.unpack_from(self._mm, start + self._key_size)
+        if oid_string is None:
+            key         = struct.unpack_from(f">{self.arcs}I", self._mm, start)
+            oid_string  = '.'.join(str(arc - 1) for arc in key if arc)
+
+        #end if
+        record          = {'oid_string': oid_string}
+        for name, offset, length in zip(INDEX_FIELDS, fields[0::2], fields[1::2]):
+            offset      += self._strings
+            record[name] = self._mm[offset:offset + length].decode('utf-8')
+
+        #end for
+        return flags, record
+
+    #end def
+
+
+    def get(self, oid):
+        """Record of the object stored under exactly oid, None if there is none."""
+
+        key = encode_key(parse_oid(oid), self.arcs)
+        if key is None:
+            return None
+
+        #end if
+        position = self._find(key)
+        return self._record(position)[1] if position >= 0 else None
+
+    #end def
+
+
+    def resolve(self, oid, instances_only=True):
+        """
+        (record, index suffix) of the object defining instance oid, as OidResolver.resolve: the longest stored
+        prefix of oid, only scalars and columns unless instances_only is False. None if no object covers oid.
+        """
+
+        oid     = parse_oid(oid)
+        depth   = min(len(oid), self.arcs)
+        key     = encode_key(oid[:depth], self.arcs)
+        while key is None and depth:
+            depth  -= 1         # An arc the index can not hold, no stored OID goes that deep
+            key     = encode_key(oid[:depth], self.arcs)
+
+        #end while
+
+        # Every prefix sorts before the OIDs under it, each shorter prefix is searched below the last position
+        hi = self._count
+        for depth in range(depth, 0, -1):
+            position = self._find(key[:4 * depth] + self._pads[depth], hi)
+            if position < 0:
+                hi = -position - 1
+                continue
+
+            #end if
+            hi = position
+            if instances_only and not self._flags(position) & ENTRY_INSTANCE:
+                continue
+
+            #end if
+            return self._record(position, '.'.join(map(str, oid[:depth])))[1], oid[depth:]
+
+        #end for
+        return None
+
+    #end def
+
+
+    def _flags(self, position):
+
+        return struct.unpack_from(">I", self._mm, self._entries + position * self._entry.size + self._key_size)[0]
+
+    #end def
+
+
+    @property
+    def entry_size(self):
+        """Bytes per entry, the key (arcs x u32) first and the flags u32 right after it."""
+
+        return self._entry.size
+
+    #end def
+
+
+    def entry_view(self):
+        """
+        memoryview over the entries (len(self) x entry_size bytes), for vectorised readers (see oid_annotate.py).
+        Release it, and anything still referencing it, before close().
+        """
+
+        return memoryview(self._mm)[self._entries:self._entries + self._count * self._entry.size]
+
+    #end def
+
+
+    def record(self, position):
+        """Record of the entry at position (in OID order)."""
+
+        return self._record(position)[1]
+
+    #end def
+
+
+    def records(self):
+        """Generator over every record in the index, in OID order."""
+
+        for position in range(self._count):
+            yield self._record(position)[1]
+
+        #end for
+    #end def
+#end class
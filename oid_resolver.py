@@ -0,0 +1,421 @@
+#######################################################################################################################
+#
+#
+#  	Project     	: 	SNMP MIB Parser
+#
+#   File            :   oid_resolver.py
+#
+#   Description     :   Resolve instance OIDs (what an agent / the Flink SNMP source emits, e.g. ifInOctets.17 =
+#                   :   1.3.6.1.2.1.2.2.1.10.17 or sysUpTime.0 = 1.3.6.1.2.1.1.3.0) to the object defining them, the
+#                   :   oid_string the records are stored under, plus the index suffix after it.
+#
+#                   :   The records are held in an OidPrefixTrie, a lookup is one longest prefix match, O(depth of
+#                   :   the OID) whatever the number of objects.
+#
+#   Usage           :   Python API
+#
+#                           resolver = OidResolver(records)             # records as extracted by mib_parser
+#                           record, suffix = resolver.resolve("1.3.6.1.2.1.2.2.1.10.17")
+#                           # record['object_name'] == 'ifInOctets', suffix == (17,)
+#
+#                   :   Only scalars and columns resolve, an OID under a table / group node but no column of it is
+#                   :   unresolved (OidResolver(records, instances_only=False) registers every node).
+#
+#                   :   Given the table index rows (mib_tables.table_index, as mib_parser.py --table-indexes stores
+#                   :   them), the index suffix of a column instance is split into typed index values as well:
+#
+#                           resolver = OidResolver(records, table_indexes)
+#                           resolver.index_values(*resolver.resolve("1.3.6.1.2.1.6.13.1.1.10.0.0.1.22.10.0.0.2.51234"))
+#                           # {'tcpConnLocalAddress': '10.0.0.1', 'tcpConnLocalPort': 22,
+#                           #  'tcpConnRemAddress': '10.0.0.2', 'tcpConnRemPort': 51234}
+#
+#                   :   Bulk, precomputes the join for a file of instance OIDs (one per line, the first whitespace
+#                   :   or comma separated field is used):
+#
+#                       python oid_resolver.py \
+#                           --mib-file mibstd/RFC1213-MIB.mib \
+#                           --mib-dirs mibstd \
+#                           --input instance_oids.txt \
+#                           --output resolved.csv
+#
+#           --mib-file:         MIB file the objects are extracted from.
+#           --mib-corpus:       Directory of MIB files the objects are extracted from (instead of --mib-file).
+#           --mib-dirs:         Comma-separated list of directories where dependent MIBs are located.
+#           --no-compile-cache: Recompile the MIBs with pysmi, see mib_parser.py.
+#           --exclude-prefixes: As mib_parser.py, use the same value as the load so the objects match the stored ones.
+#           --input:            File of instance OIDs (defaults to stdin).
+#           --output:           Output file (defaults to stdout).
+#           --format:           csv or jsonl (defaults to csv).
+#
+#                   :   The output carries the decoded index values of table columns in index_values (JSON text in csv).
+#
+#	By              :   George Leonard ( georgelza@gmail.com )
+#
+#   Created     	:   11 Jul 2025
+#
+#
+########################################################################################################################
+__author__      = "George Leonard"
+__email__       = "georgelza@gmail.com"
+__version__     = "0.0.1"
+__copyright__   = "Copyright 2025, George Leonard"
+
+
+from oid_trie import OidPrefixTrie, parse_oid
+
+import argparse, contextlib, csv, json, sys
+
+
+# data_type of the records that are no scalar or column (tables, rows, groups, identities, ...), they hold no instances
+NON_INSTANCE_TYPES = frozenset((
+    '', 'MibTable', 'MibTableRow', 'MibIdentifier', 'ObjectIdentity', 'ModuleIdentity', 'ObjectGroup',
+    'NotificationGroup', 'NotificationType', 'ModuleCompliance', 'AgentCapabilities',
+))
+
+# Columns of the bulk output, the object fields are empty when the instance OID did not resolve
+RESOLVED_COLUMNS = ('instance_oid', 'oid_string', 'object_name', 'mib_module', 'oid_type', 'data_type', 'index')
+
+# Bulk output columns of the oid_resolver.py command, index_values empty unless the index suffix decoded
+DECODED_COLUMNS  = RESOLVED_COLUMNS + ('index_values',)
+
+
+def _index_value(fmt, arcs):
+    """Typed value of an index object's arcs: int, dotted ip / oid string, text or colon separated hex octets."""
+
+    if fmt == 'int':
+        return arcs[0]
+
+    elif fmt in ('ip', 'oid'):
+        return '.'.join(map(str, arcs))
+
+    elif fmt == 'text':
+        return bytes(arcs).decode('utf-8', 'replace')
+
+    #end if
+    return bytes(arcs).hex(':')
+
+#end def
+
+
+def decode_index(index_objects, suffix):
+    """
+    Split the index suffix of a column instance (a tuple of ints) into {index object name: value} along the
+    index_objects of its row (mib_tables.index_object dicts, in INDEX order). Raises ValueError when the suffix
+    is too short for them, leaves arcs over or holds an octet above 255.
+    """
+
+    values      = {}
+    position    = 0
+    for index_object in index_objects:
+        encoding = index_object['encoding']
+        if encoding == 'implied':
+            width = len(suffix) - position
+
+        elif encoding == 'length':
+            if position >= len(suffix):
+                raise ValueError(f"Index suffix {suffix} has no length arc for {index_object['name']}")
+
+            #end if
+            width       = suffix[position]
+            position   += 1
+
+        else:
+            width = index_object['length']     # Fixed width encodings, see mib_tables
+
+        #end if
+        arcs = suffix[position:position + width]
+        if len(arcs) < width:
+            raise ValueError(f"Index suffix {suffix} too short for {index_object['name']}")
+
+        #end if
+        if encoding == 'networkaddress':
+            arcs = arcs[1:]             # The NetworkAddress CHOICE tag, 1 is internet (IpAddress)
+
+        #end if
+        values[index_object['name']]    = _index_value(index_object['format'], arcs)
+        position                       += width
+
+    #end for
+    if position != len(suffix):
+        raise ValueError(f"Index suffix {suffix} has {len(suffix) - position} arcs left over")
+
+    #end if
+    return values
+
+#end def
+
+
+class OidResolver:
+    """
+    Maps instance OIDs to the object record defining them, by longest prefix over the records' oid_string.
+    Only scalars and columns are registered, unless instances_only is False, so an OID under a table, row or
+    group node but no column of it does not resolve to that node.
+    The table_indexes rows (mib_tables.table_index) let index_values decode the index suffix of a column.
+    """
+
+    def __init__(self, records=(), table_indexes=(), instances_only=True):
+
+        self._trie          = OidPrefixTrie()
+        self._indexes       = {}            # row oid_string -> index objects
+        self.instances_only = instances_only
+        for record in records:
+            self.add(record)
+
+        #end for
+        for row in table_indexes:
+            self.add_table_index(row)
+
+        #end for
+    #end def
+
+
+    def __len__(self):
+        return len(self._trie)
+
+    #end def
+
+
+    def add(self, record):
+        """Register an OID record (a dict with at least oid_string), a later record for the same OID replaces it."""
+
+        if self.instances_only and record.get('data_type', '') in NON_INSTANCE_TYPES:
+            return
+
+        #end if
+        self._trie.add(record['oid_string'], record)
+
+    #end def
+
+
+    def add_table_index(self, row):
+        """Register a table index row, index_objects as a list or as the JSON text a SQL table stores it as."""
+
+        index_objects = row['index_objects']
+        if isinstance(index_objects, str):
+            index_objects = json.loads(index_objects)
+
+        #end if
+        self._indexes[row['oid_string']] = index_objects
+
+    #end def
+
+
+    def index_values(self, record, suffix):
+        """
+        {index object name: value} of a resolved column instance (record, suffix as returned by resolve), None when
+        the record is no column of a registered table row. Raises ValueError when the suffix does not decode.
+        """
+
+        index_objects = self._indexes.get(record['oid_string'].rpartition('.')[0])
+        if index_objects is None:
+            return None
+
+        #end if
+        return decode_index(index_objects, suffix)
+
+    #end def
+
+
+    def resolve(self, oid):
+        """
+        (record, index suffix) of the object defining oid, the suffix a tuple of ints, () when oid is the object
+        itself. None if no object covers oid. Raises ValueError when oid is not an OID.
+        """
+
+        oid   = parse_oid(oid)
+        match = self._trie.longest_prefix(oid)
+        if match is None:
+            return None
+
+        #end if
+        depth, record = match
+        return record, oid[depth:]
+
+    #end def
+
+
+    def resolve_all(self, oids):
+        """Generator of (oid, resolve(oid)), the resolution is None for OIDs that do not resolve or do not parse."""
+
+        for oid in oids:
+            try:
+                yield oid, self.resolve(oid)
+
+            except ValueError:
+                yield oid, None
+
+            #end try
+        #end for
+    #end def
+#end class
+
+
+def resolved_row(instance_oid, resolution):
+    """Bulk output row of an instance OID, as a dict over RESOLVED_COLUMNS."""
+
+    row = dict.fromkeys(RESOLVED_COLUMNS)
+    row['instance_oid'] = instance_oid
+    if resolution is not None:
+        record, suffix = resolution
+        for column in RESOLVED_COLUMNS[1:-1]:
+            row[column] = record.get(column)
+
+        #end for
+        row['index'] = '.'.join(str(arc) for arc in suffix)
+
+    #end if
+    return row
+
+#end def
+
+
+def read_oids(stream):
+    """Instance OIDs of a text stream, the first whitespace or comma separated field of every non empty line."""
+
+    for line in stream:
+        fields = line.replace(',', ' ').split()
+        if fields and not fields[0].startswith('#'):
+            yield fields[0]
+
+        #end if
+    #end for
+#end def
+
+
+def write_rows(rows, stream, output_format, columns=RESOLVED_COLUMNS):
+    """Write the resolved rows (dicts over columns) as csv (with a header) or jsonl, returns the number written."""
+
+    count = 0
+    if output_format == 'csv':
+        writer = csv.DictWriter(stream, fieldnames=columns)
+        writer.writeheader()
+
+    #end if
+    for row in rows:
+        if output_format == 'csv':
+            writer.writerow(row)
+
+        else:
+            stream.write(json.dumps(row) + "\n")
+
+        #end if
+        count += 1
+
+    #end for
+    return count
+
+#end def
+
+
+def extract_records(args, log, keyed_rows=None):
+    """
+    The OID records of --mib-file / --mib-corpus, extracted the way mib_parser loads them. The keyed table rows
+    (kind -> list, see mib_parser.walk_mib) are collected into keyed_rows when given.
+    """
+
+    import mib_parser
+
+    mib_dirs         = [d.strip() for d in args.mib_dirs.split(',')]
+    exclude_prefixes = [p.strip() for p in args.exclude_prefixes.split(',') if p.strip()]
+    mib_files        = mib_parser.discover_mib_files(args.mib_corpus, log) if args.mib_corpus else [args.mib_file]
+
+    # The walk prints every record, keep that off stdout, the resolved output may be going there
+    with contextlib.redirect_stdout(sys.stderr):
+        for mib_file in mib_files:
+            parsed_oids = mib_parser.extractor(mib_file, mib_dirs, log, args.compile_cache, exclude_prefixes, keyed_rows=keyed_rows)
+            if parsed_oids is None:
+                log.warning(f"Could not extract {mib_file}, its objects will not resolve")
+                continue
+
+            #end if
+            yield from parsed_oids
+
+        #end for
+    #end with
+#end def
+
+
+def parse_arguments():
+
+    import mib_parser
+
+    parser = argparse.ArgumentParser(description="Resolve instance OIDs to the MIB object defining them and their index suffix.")
+
+    mib_source_group = parser.add_mutually_exclusive_group(required=True)
+    mib_source_group.add_argument('--mib-file',     help='MIB file the objects are extracted from')
+    mib_source_group.add_argument('--mib-corpus',   help='Directory of MIB files the objects are extracted from')
+    parser.add_argument('--mib-dirs',               required=True, help='Comma-separated list of MIB directories containing dependencies')
+    parser.add_argument('--no-compile-cache',       dest='compile_cache', action='store_false', help='Recompile MIBs with pysmi even if the compile cache holds an up to date copy.')
+    parser.add_argument('--exclude-prefixes',       default=','.join(mib_parser.DEFAULT_EXCLUDED_PREFIXES), help='Comma-separated OID prefixes, as given to mib_parser.py for the load.')
+    parser.add_argument('--input',                  default='-', help='File of instance OIDs, one per line. Defaults to stdin.')
+    parser.add_argument('--output',                 default='-', help='Output file. Defaults to stdout.')
+    parser.add_argument('--format',                 choices=['csv', 'jsonl'], default='csv', help='Output format. Defaults to csv.')
+
+    return parser.parse_args()
+
+#end def
+
+
+def main():
+
+    import mib_parser
+    from utils import logger
+
+    args = parse_arguments()
+    log  = logger(filename           = f"oid_resolver_{mib_parser.datetime_str}.log",
+                  console_debuglevel = 2,     # WARNING, the console may be carrying the output
+                  file_debuglevel    = mib_parser.FILE_DEBUG_LEVEL,
+                  console_format     = mib_parser.CONSOLE_LOG_FORMAT,
+                  file_format        = mib_parser.FILE_LOG_FORMAT
+            )
+
+    table_indexes   = []
+    resolver        = OidResolver(extract_records(args, log, {'table_indexes': table_indexes}))
+    for row in table_indexes:
+        resolver.add_table_index(row)
+
+    #end for
+    log.info(f"Resolver holds {len(resolver)} objects, {len(table_indexes)} table indexes")
+
+    with contextlib.ExitStack() as stack:
+        source  = sys.stdin  if args.input  == '-' else stack.enter_context(open(args.input,  'r', encoding='utf-8'))
+        target  = sys.stdout if args.output == '-' else stack.enter_context(open(args.output, 'w', encoding='utf-8', newline=''))
+
+        resolved = unresolved = undecoded = 0
+        def rows():
+            nonlocal resolved, unresolved, undecoded
+            for instance_oid, resolution in resolver.resolve_all(read_oids(source)):
+                row = dict(resolved_row(instance_oid, resolution), index_values=None)
+                if resolution is None:
+                    unresolved += 1
+
+                else:
+                    resolved += 1
+                    try:
+                        row['index_values'] = resolver.index_values(*resolution)
+
+                    except ValueError as e:
+                        undecoded += 1
+                        log.debug(f"{instance_oid}: {e}")
+
+                    #end try
+                    if row['index_values'] is not None and args.format == 'csv':
+                        row['index_values'] = json.dumps(row['index_values'])
+
+                    #end if
+                #end if
+                yield row
+
+            #end for
+        #end def
+
+        write_rows(rows(), target, args.format, DECODED_COLUMNS)
+
+    #end with
+    log.info(f"{resolved} instance OIDs resolved, {unresolved} unresolved, {undecoded} with an index suffix that did not decode")
+
+#end def
+
+
+if __name__ == "__main__":
+    main()
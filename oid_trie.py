@@ -0,0 +1,143 @@
+#######################################################################################################################
+#
+#
+#  	Project     	: 	SNMP MIB Parser
+#
+#   File            :   oid_trie.py
+#
+#   Description     :   Prefix trie over OIDs held as integer tuples.
+#
+#                   :   Answers "which configured prefix covers this OID" in O(depth of the OID), independent of the
+#                   :   number of prefixes, and compares arcs as integers so 1.3.6.1.2.1.1 does not cover
+#                   :   1.3.6.1.2.1.10 or 1.3.6.1.2.1.100 the way a dotted string startswith() does.
+#
+#	By              :   George Leonard ( georgelza@gmail.com )
+#
+#   Created     	:   11 Jul 2025
+#
+#
+########################################################################################################################
+__author__      = "George Leonard"
+__email__       = "georgelza@gmail.com"
+__version__     = "0.0.1"
+__copyright__   = "Copyright 2025, George Leonard"
+
+
+_VALUE = object()       # Key under which a node stores the value of the prefix ending there
+
+
+def parse_oid(oid):
+    """Turn '1.3.6.1', '.1.3.6.1', (1, 3, 6, 1) or a pysnmp ObjectName into a tuple of ints."""
+
+    if isinstance(oid, str):
+        oid = oid.strip().strip('.')
+        return tuple(int(x) for x in oid.split('.')) if oid else ()
+
+    #end if
+    return tuple(int(x) for x in oid)
+
+#end def
+
+
+class OidPrefixTrie:
+    """
+    Set of OID prefixes, each optionally carrying a value, with longest prefix lookup.
+    """
+
+    def __init__(self, prefixes=()):
+
+        self._root  = {}
+        self._count = 0
+
+        for prefix in prefixes:
+            self.add(prefix)
+
+        #end for
+    #end def
+
+
+    def __len__(self):
+        return self._count
+
+    #end def
+
+
+    def add(self, prefix, value=None):
+        """Register a prefix, value defaults to the prefix tuple itself."""
+
+        prefix = parse_oid(prefix)
+        node   = self._root
+        for arc in prefix:
+            node = node.setdefault(arc, {})
+
+        #end for
+
+        if _VALUE not in node:
+            self._count += 1
+
+        #end if
+        node[_VALUE] = prefix if value is None else value
+
+    #end def
+
+
+    def longest_prefix(self, oid):
+        """
+        (prefix length, value) of the longest registered prefix covering oid, or None.
+        The prefix itself is oid[:length].
+        """
+
+        node    = self._root
+        match   = (0, node[_VALUE]) if _VALUE in node else None
+        depth   = 0
+
+        for arc in oid:
+            node = node.get(arc)
+            if node is None:
+                break
+
+            #end if
+            depth += 1
+            if _VALUE in node:
+                match = (depth, node[_VALUE])
+
+            #end if
+        #end for
+        return match
+
+    #end def
+
+
+    def covering(self, oid):
+        """Value of the longest registered prefix covering oid, or None."""
+
+        match = self.longest_prefix(oid)
+        return match[1] if match else None
+
+    #end def
+
+
+    def covers(self, oid):
+        """True if any registered prefix covers oid."""
+
+        node = self._root
+        if _VALUE in node:
+            return True
+
+        #end if
+
+        for arc in oid:
+            node = node.get(arc)
+            if node is None:
+                return False
+
+            #end if
+            if _VALUE in node:
+                return True
+
+            #end if
+        #end for
+        return False
+
+    #end def
+#end class
@@ -0,0 +1,380 @@
+#######################################################################################################################
+#
+#
+#  	Project     	: 	SNMP MIB Parser
+#
+#   File            :   smi_lexer.py
+#
+#   Description     :   Linear time SMIv1/SMIv2 tokenizer and definition reader.
+#
+#                   :   tokenize() walks the source text once with a single compiled regex, every alternative of which
+#                   :   is bounded (no lazy bodies, no lookaheads), so the cost is linear in the size of the file.
+#                   :   Quoted strings are recognised before comments, so a '--' inside a DESCRIPTION stays text.
+#
+#                   :   iter_definitions() reads the token stream and yields one record per macro invocation
+#                   :   (OBJECT-TYPE, MODULE-IDENTITY, NOTIFICATION-TYPE, TEXTUAL-CONVENTION, ...), per
+#                   :   OBJECT IDENTIFIER assignment and one for the IMPORTS clause. MACRO ... END bodies, as found
+#                   :   in the SMI modules themselves, are skipped.
+#
+#	By              :   George Leonard ( georgelza@gmail.com )
+#
+#   Created     	:   11 Jul 2025
+#
+#
+########################################################################################################################
+__author__      = "George Leonard"
+__email__       = "georgelza@gmail.com"
+__version__     = "0.0.1"
+__copyright__   = "Copyright 2025, George Leonard"
+
+
+import re
+
+
+# Token kinds
+IDENT   = 'ident'
+NUMBER  = 'number'
+STRING  = 'string'
+QUOTED  = 'quoted'         # 'xx'H / '0101'B literals
+ASSIGN  = 'assign'         # ::=
+RANGE   = 'range'          # ..
+OP      = 'op'             # any other single character { } ( ) , ; | etc.
+
+_TOKEN_RE = re.compile(r'''
+     (?P<ws>\s+)
+    |(?P<string>"[^"]*(?:""[^"]*)*")
+    |(?P<comment>--[^\n]*)
+    |(?P<quoted>'[^']*'[HhBb]?)
+    |(?P<assign>::=)
+    |(?P<range>\.\.)
+    |(?P<number>-?[0-9]+)
+    |(?P<ident>[A-Za-z][A-Za-z0-9_]*(?:-[A-Za-z0-9_]+)*)
+    |(?P<op>.)
+''', re.VERBOSE | re.DOTALL)
+
+# Macros whose invocations are reported as definitions
+MACROS = frozenset((
+    'OBJECT-TYPE', 'OBJECT-IDENTITY', 'MODULE-IDENTITY', 'NOTIFICATION-TYPE', 'TRAP-TYPE',
+    'OBJECT-GROUP', 'NOTIFICATION-GROUP', 'MODULE-COMPLIANCE', 'AGENT-CAPABILITIES', 'TEXTUAL-CONVENTION',
+))
+
+# Clause keywords that open a new clause inside a macro invocation
+CLAUSES = frozenset((
+    'SYNTAX', 'UNITS', 'MAX-ACCESS', 'ACCESS', 'MIN-ACCESS', 'STATUS', 'DESCRIPTION', 'REFERENCE', 'INDEX',
+    'AUGMENTS', 'DEFVAL', 'OBJECTS', 'NOTIFICATIONS', 'LAST-UPDATED', 'ORGANIZATION', 'CONTACT-INFO', 'REVISION',
+    'ENTERPRISE', 'VARIABLES', 'DISPLAY-HINT', 'MODULE', 'MANDATORY-GROUPS', 'GROUP', 'OBJECT', 'WRITE-SYNTAX',
+    'PRODUCT-RELEASE', 'SUPPORTS', 'INCLUDES', 'VARIATION', 'CREATION-REQUIRES',
+))
+
+# Types whose name spans two tokens
+_TWO_WORD_TYPES = {'OCTET': 'STRING', 'OBJECT': 'IDENTIFIER'}
+
+_OPEN   = {'{': '}', '(': ')'}
+
+
+def tokenize(text):
+    """
+    Yield (kind, value) tokens for a MIB source text, whitespace and comments dropped.
+    STRING values are returned without the surrounding quotes (a doubled "" is unescaped).
+    """
+
+    for match in _TOKEN_RE.finditer(text):
+        kind = match.lastgroup
+        if kind == 'ws' or kind == 'comment':
+            continue
+
+        #end if
+
+        value = match.group()
+        if kind == 'string':
+            value = value[1:-1].replace('""', '"')
+
+        #end if
+        yield kind, value
+
+    #end for
+#end def
+
+
+def _is_value_name(token):
+    """ASN.1 value references (object names) start with a lower case letter."""
+
+    return token[0] == IDENT and token[1][0].islower()
+
+#end def
+
+
+def _skip_balanced(tokens, i):
+    """tokens[i] opens a { or ( group, return the index just past its matching close."""
+
+    depth = 0
+    n     = len(tokens)
+    while i < n:
+        value = tokens[i][1]
+        if tokens[i][0] == OP:
+            if value in _OPEN:
+                depth += 1
+
+            elif value in ('}', ')'):
+                depth -= 1
+                if depth == 0:
+                    return i + 1
+
+                #end if
+            #end if
+        #end if
+        i += 1
+
+    #end while
+    return i
+
+#end def
+
+
+def _read_type(tokens, i):
+    """
+    Read a type specification starting at tokens[i] (the value of a SYNTAX clause).
+    Returns (type name, index past the spec). The name is the base type, e.g. 'Integer32', 'OCTET STRING',
+    'SEQUENCE OF IfEntry'; any trailing {named numbers} / (constraints) are consumed but not part of the name.
+    """
+
+    n = len(tokens)
+    if i >= n:
+        return "", i
+
+    #end if
+
+    name = tokens[i][1]
+    i   += 1
+
+    if name in _TWO_WORD_TYPES and i < n and tokens[i][1] == _TWO_WORD_TYPES[name]:
+        name = f"{name} {tokens[i][1]}"
+        i   += 1
+
+    elif name == 'SEQUENCE' and i < n and tokens[i][1] == 'OF':
+        if i + 1 < n:
+            name = f"SEQUENCE OF {tokens[i + 1][1]}"
+            i   += 2
+
+        #end if
+    #end if
+
+    # Named numbers / bits and (SIZE ..) / (range) constraints
+    while i < n and tokens[i][0] == OP and tokens[i][1] in _OPEN:
+        i = _skip_balanced(tokens, i)
+
+    #end while
+    return name, i
+
+#end def
+
+
+def _read_macro(tokens, i, name, macro):
+    """
+    Read the body of a macro invocation, tokens[i] being the first token after the macro keyword.
+    Returns (record, index past the invocation).
+    """
+
+    n       = len(tokens)
+    record  = {'name': name, 'macro': macro, 'description': None, 'syntax': None, 'clauses': {}, 'value': []}
+    clause  = None
+
+    while i < n:
+        kind, value = tokens[i]
+
+        if kind == ASSIGN:
+            i += 1
+            if i < n and tokens[i][1] == '{':
+                end             = _skip_balanced(tokens, i)
+                record['value'] = [v for _, v in tokens[i + 1:end - 1]]
+                i               = end
+
+            elif i < n:
+                record['value'] = [tokens[i][1]]            # TRAP-TYPE style plain number
+                i += 1
+
+            #end if
+            return record, i
+
+        #end if
+
+        if kind == IDENT and value in CLAUSES:
+            clause = value
+            i     += 1
+
+            if clause == 'SYNTAX':
+                syntax, i        = _read_type(tokens, i)
+                if record['syntax'] is None:            # MODULE-COMPLIANCE refinements carry their own SYNTAX
+                    record['syntax'] = syntax
+
+                #end if
+                record['clauses'].setdefault(clause, []).append([syntax])
+
+                # A TEXTUAL-CONVENTION has no ::= value, SYNTAX is its last clause
+                if macro == 'TEXTUAL-CONVENTION':
+                    return record, i
+
+                #end if
+                clause = None
+
+            elif clause == 'DESCRIPTION' and i < n and tokens[i][0] == STRING:
+                if record['description'] is None:
+                    record['description'] = tokens[i][1]
+
+                #end if
+                record['clauses'].setdefault(clause, []).append([tokens[i][1]])
+                i += 1
+                clause = None
+
+            else:
+                record['clauses'].setdefault(clause, []).append([])
+
+            #end if
+            continue
+
+        #end if
+
+        # A new definition starting means this invocation was malformed, stop here and let the caller resume
+        if macro != 'TEXTUAL-CONVENTION' and _is_value_name(tokens[i]) and i + 1 < n and tokens[i + 1][1] in MACROS:
+            return record, i
+
+        #end if
+
+        if kind == OP and value in _OPEN:
+            end = _skip_balanced(tokens, i)
+            if clause:
+                record['clauses'][clause][-1].extend(v for _, v in tokens[i:end])
+
+            #end if
+            i = end
+            continue
+
+        #end if
+
+        if clause:
+            record['clauses'][clause][-1].append(value)
+
+        #end if
+        i += 1
+
+    #end while
+    return record, i
+
+#end def
+
+
+def _read_imports(tokens, i):
+    """Read an IMPORTS clause, tokens[i] being the first token after IMPORTS. Returns ({module: [symbols]}, index)."""
+
+    n       = len(tokens)
+    imports = {}
+    symbols = []
+
+    while i < n and tokens[i][1] != ';':
+        kind, value = tokens[i]
+        if kind == IDENT and value == 'FROM' and i + 1 < n:
+            imports.setdefault(tokens[i + 1][1], []).extend(symbols)
+            symbols = []
+            i      += 2
+            continue
+
+        #end if
+
+        if kind == IDENT:
+            symbols.append(value)
+
+        #end if
+        i += 1
+
+    #end while
+    return imports, i + 1
+
+#end def
+
+
+def iter_definitions(text):
+    """
+    Yield one record per definition in the MIB text, in source order:
+
+        {'name', 'macro', 'description', 'syntax', 'clauses', 'value'}
+
+    'macro' is the macro keyword (e.g. 'OBJECT-TYPE'), or 'OBJECT IDENTIFIER' for plain OID assignments, in which
+    case only 'value' is filled. 'clauses' maps each clause keyword to a list of its occurrences (REVISION can
+    repeat), each a list of token values. 'value' is the list of tokens inside the ::= { ... } OID value.
+    The IMPORTS clause is reported as {'name': None, 'macro': 'IMPORTS', 'imports': {module: [symbols]}}.
+    """
+
+    tokens  = list(tokenize(text))
+    n       = len(tokens)
+    i       = 0
+
+    while i < n:
+        kind, value = tokens[i]
+
+        if kind != IDENT:
+            i += 1
+            continue
+
+        #end if
+
+        # MACRO definitions (only in the SMI modules), skip the body up to END
+        if value == 'MACRO':
+            i += 1
+            while i < n and tokens[i] != (IDENT, 'END'):
+                i += 1
+
+            #end while
+            i += 1
+            continue
+
+        #end if
+
+        if value == 'IMPORTS':
+            imports, i = _read_imports(tokens, i + 1)
+            yield {'name': None, 'macro': 'IMPORTS', 'description': None, 'syntax': None, 'clauses': {}, 'value': [], 'imports': imports}
+            continue
+
+        #end if
+
+        if i + 1 >= n:
+            break
+
+        #end if
+
+        next_value = tokens[i + 1][1]
+
+        # name MACRO-KEYWORD ... ::= { ... }
+        if _is_value_name(tokens[i]) and next_value in MACROS and tokens[i + 1][0] == IDENT:
+            record, i = _read_macro(tokens, i + 2, value, next_value)
+            yield record
+            continue
+
+        #end if
+
+        # name OBJECT IDENTIFIER ::= { ... }
+        if (_is_value_name(tokens[i]) and next_value == 'OBJECT' and i + 3 < n
+                and tokens[i + 2][1] == 'IDENTIFIER' and tokens[i + 3][0] == ASSIGN):
+            record = {'name': value, 'macro': 'OBJECT IDENTIFIER', 'description': None, 'syntax': None, 'clauses': {}, 'value': []}
+            i     += 4
+            if i < n and tokens[i][1] == '{':
+                end             = _skip_balanced(tokens, i)
+                record['value'] = [v for _, v in tokens[i + 1:end - 1]]
+                i               = end
+
+            #end if
+            yield record
+            continue
+
+        #end if
+
+        # TypeName ::= TEXTUAL-CONVENTION ...
+        if next_value == '::=' and i + 2 < n and tokens[i + 2] == (IDENT, 'TEXTUAL-CONVENTION'):
+            record, i = _read_macro(tokens, i + 3, value, 'TEXTUAL-CONVENTION')
+            yield record
+            continue
+
+        #end if
+        i += 1
+
+    #end while
+#end def